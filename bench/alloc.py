@@ -0,0 +1,121 @@
+"""
+Check that detection passes do not allocate full-frame arrays.
+
+Runs repeated detection passes on synthetic BGRA frames, the layout the mss
+backend delivers, under tracemalloc, once with a source's reused
+FrameBuffers and once without. Each pass gets a fresh capture array, as a
+real grab does, so only the conversions and matching are measured. With
+buffers the colour, grayscale and downscaled views cost nothing after the
+first pass; what remains of the pass peak is matchTemplate's per-call score
+maps, bounded by the match pool size.
+
+Exits non-zero if, with buffers, the conversions still allocate, retained
+memory grows, or the pass peak drifts by more than --slack after warm-up.
+
+Usage:
+    python -m bench.alloc
+    python -m bench.alloc --passes 20 --mode pyramid
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+
+import numpy as np
+
+from bench.fft import synthetic_frame
+from constants import MATCH_MODE
+from detection import (
+    detect_confirm_button,
+    detect_follow_buttons,
+    detect_unfollow_buttons,
+    follow_templates,
+    unfollow_templates,
+)
+from frame import Frame, FrameBuffers
+from image_rec import PYRAMID_SCALE
+
+WARMUP_PASSES = 3
+
+
+def convert(frame: Frame) -> None:
+    frame.color, frame.gray, frame.scaled((PYRAMID_SCALE, PYRAMID_SCALE))
+
+
+def detection_pass(frame: Frame, mode: str) -> None:
+    detect_unfollow_buttons(frame, mode=mode, tracker=None)
+    detect_confirm_button(frame, mode=mode, tracker=None, stats=None)
+    detect_follow_buttons(frame, mode=mode, tracker=None, stats=None)
+
+
+def run_passes(pixels: np.ndarray, passes: int, mode: str, buffers: FrameBuffers | None) -> list[tuple[int, int, int]]:
+    """Per-pass (retained, conversion peak, pass peak) bytes, measured from the start of the run."""
+    # Untraced warm-up: template variants, spectra and the match pool are built once per process
+    frame = Frame(pixels.copy(), order="BGRA", buffers=buffers)
+    convert(frame)
+    detection_pass(frame, mode)
+
+    samples = []
+    tracemalloc.start()
+    try:
+        for _ in range(passes):
+            frame = Frame(pixels.copy(), order="BGRA", buffers=buffers)
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            convert(frame)
+            convert_peak = tracemalloc.get_traced_memory()[1] - base
+            tracemalloc.reset_peak()
+            detection_pass(frame, mode)
+            pass_peak = tracemalloc.get_traced_memory()[1] - base
+            del frame
+            gc.collect()
+            samples.append((tracemalloc.get_traced_memory()[0], convert_peak, pass_peak))
+    finally:
+        tracemalloc.stop()
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure per-pass allocations of frame conversion and matching")
+    parser.add_argument("--passes", type=int, default=8, help="Detection passes per run")
+    parser.add_argument("--mode", default=MATCH_MODE, help="Matching mode")
+    parser.add_argument("--slack", type=float, default=0.1, help="Allowed relative peak drift after warm-up")
+    args = parser.parse_args(argv)
+
+    bgr = synthetic_frame(unfollow_templates.templates + follow_templates.templates)
+    pixels = np.dstack([bgr, np.full(bgr.shape[:2], 255, np.uint8)])
+    frame_mb = pixels.nbytes / 1e6
+
+    print(f"{args.passes} passes, mode {args.mode}, {pixels.shape[1]}x{pixels.shape[0]} BGRA ({frame_mb:.1f} MB per capture)")
+    print(f"{'buffers':<8} {'retained MB (first/last)':>25} {'convert MB':>11} {'pass peak MB (min/max)':>23}")
+    results = {}
+    for label, buffers in (("none", None), ("reused", FrameBuffers())):
+        samples = run_passes(pixels, args.passes, args.mode, buffers)
+        results[label] = samples
+        peaks = [peak for _, _, peak in samples]
+        print(
+            f"{label:<8} {samples[0][0] / 1e6:>12.2f} / {samples[-1][0] / 1e6:<10.2f} "
+            f"{max(convert for _, convert, _ in samples) / 1e6:>11.2f} "
+            f"{min(peaks) / 1e6:>11.2f} / {max(peaks) / 1e6:<9.2f}"
+        )
+
+    steady = results["reused"][WARMUP_PASSES:]
+    kept = [kept for kept, _, _ in steady]
+    peaks = [peak for _, _, peak in steady]
+    failures = []
+    # A few kB of drift is interpreter bookkeeping; a leaked frame copy is megabytes
+    if kept[-1] - kept[0] > 0.1 * pixels.nbytes:
+        failures.append(f"retained memory grew by {(kept[-1] - kept[0]) / 1e6:.2f} MB")
+    if max(peaks) > (1 + args.slack) * min(peaks):
+        failures.append(f"pass peak varied from {min(peaks) / 1e6:.2f} to {max(peaks) / 1e6:.2f} MB")
+    if max(convert for _, convert, _ in steady) > 0.1 * pixels.nbytes:
+        failures.append("frame conversions still allocate with reused buffers")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+Check the DevTools client (cdp.py) against a local stub CDP server.
+
+The stub answers /json/list and speaks the WebSocket side of the protocol
+for the handful of methods the client uses. Navigating loads one of the
+static pages in bench/fixtures/cdp/, and element lookups are answered from
+that page's buttons. The stub has no layout engine, so each button gives
+its bounding rect in a data-rect attribute. No Chrome, display or network
+access is needed.
+
+The checks cover:
+- choosing the visible x.com tab over a background first tab;
+- navigation with events and pings interleaved with replies;
+- button lookups with selector, viewport and region filtering;
+- protocol errors;
+- fragmented and 64-bit-length frames;
+- an unreachable port.
+
+Usage:
+    python -m bench.cdp
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import socket
+import socketserver
+import struct
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urlparse
+
+import cdp
+from cdp import WS_GUID, CDPClient, CDPError
+from image_rec import Region
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "cdp"
+
+# Window geometry the stub reports to ELEMENT_CENTERS_JS: a maximised
+# 1920x1080 window whose tab strip and toolbar take the top 85 pixels
+WINDOW = {"screenX": 0, "screenY": 0, "outerWidth": 1920, "outerHeight": 1050, "innerWidth": 1920, "innerHeight": 965}
+CONTENT_TOP = 85
+
+# Replies longer than this are sent as two WebSocket fragments, the first
+# this long
+FRAGMENT_BYTES = 4096
+
+BUTTON_RE = re.compile(r'<button[^>]*data-testid="([^"]+)"[^>]*data-rect="([^"]+)"')
+SELECTOR_RE = re.compile(r'^\[data-testid(\$?=)"([^"]+)"\]$')
+
+
+def fixture_for(url: str) -> str | None:
+    """Fixture page served for a URL, picked by the last path segment."""
+    path = urlparse(url).path.rstrip("/")
+    return {"following": "following.html", "followers": "followers.html", "confirm": "confirm.html"}.get(
+        path.rsplit("/", 1)[-1]
+    )
+
+
+def element_centers(fixture: str | None, selector: str) -> list[list[int]]:
+    """What ELEMENT_CENTERS_JS returns for a fixture page in the stub's window."""
+    if fixture is None:
+        return []
+    match = SELECTOR_RE.match(selector)
+    if match is None:
+        raise ValueError(f"Stub can't evaluate selector {selector!r}")
+    op, value = match.groups()
+    html = (FIXTURES_DIR / fixture).read_text(encoding="utf-8")
+    centers = []
+    for testid, rect in BUTTON_RE.findall(html):
+        if not (testid.endswith(value) if op == "$=" else testid == value):
+            continue
+        left, top, width, height = (float(v) for v in rect.split(","))
+        if width <= 0 or height <= 0 or top + height <= 0 or top >= WINDOW["innerHeight"]:
+            continue
+        centers.append([round(left + width / 2), round(CONTENT_TOP + top + height / 2)])
+    return centers
+
+
+class StubTab:
+    def __init__(self, tab_id: str, url: str, visible: bool):
+        self.id = tab_id
+        self.url = url
+        self.visible = visible
+
+
+class StubChrome(socketserver.ThreadingTCPServer):
+    """A DevTools endpoint on 127.0.0.1 with a fixed set of tabs."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, tabs: list[StubTab]):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.tabs = {tab.id: tab for tab in tabs}
+        self.port = self.server_address[1]
+        self.attached: list[str] = []
+        self.pongs: list[bytes] = []
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def __enter__(self) -> "StubChrome":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class StubHandler(socketserver.BaseRequestHandler):
+    server: StubChrome
+
+    def handle(self) -> None:
+        self.buffer = b""
+        while b"\r\n\r\n" not in self.buffer:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return
+            self.buffer += chunk
+        head, _, self.buffer = self.buffer.partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        path = lines[0].split(" ")[1]
+        headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+
+        if path == "/json/list":
+            body = json.dumps([
+                {
+                    "id": tab.id,
+                    "type": "page",
+                    "url": tab.url,
+                    "webSocketDebuggerUrl": f"ws://127.0.0.1:{self.server.port}/devtools/page/{tab.id}",
+                }
+                for tab in self.server.tabs.values()
+            ]).encode()
+            self.request.sendall(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+                + body
+            )
+            return
+
+        tab = self.server.tabs.get(path.rsplit("/", 1)[-1])
+        if tab is None or headers.get("upgrade", "").lower() != "websocket":
+            self.request.sendall(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+        accept = base64.b64encode(hashlib.sha1((headers["sec-websocket-key"] + WS_GUID).encode()).digest()).decode()
+        self.request.sendall(
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        self.tab = tab
+        self.pongs = self.server.pongs
+        self.server.attached.append(tab.id)
+        while True:
+            message = self.recv_message()
+            if message is None:
+                return
+            self.dispatch(json.loads(message))
+
+    # WebSocket framing, server side: incoming frames are masked, outgoing ones aren't
+
+    def read_exact(self, n: int) -> bytes | None:
+        while len(self.buffer) < n:
+            chunk = self.request.recv(65536)
+            if not chunk:
+                return None
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+        return data
+
+    def recv_message(self) -> str | None:
+        while True:
+            head = self.read_exact(2)
+            if head is None:
+                return None
+            first, second = head
+            n = second & 0x7F
+            if n == 126:
+                n = struct.unpack(">H", self.read_exact(2))[0]
+            elif n == 127:
+                n = struct.unpack(">Q", self.read_exact(8))[0]
+            key = self.read_exact(4)
+            payload = bytes(b ^ key[i % 4] for i, b in enumerate(self.read_exact(n)))
+            opcode = first & 0x0F
+            if opcode == 0x8:
+                return None
+            if opcode == 0xA:
+                self.pongs.append(payload)
+                continue
+            return payload.decode("utf-8")
+
+    def send_frame(self, opcode: int, payload: bytes, final: bool = True) -> None:
+        header = bytearray([(0x80 if final else 0) | opcode])
+        n = len(payload)
+        if n < 126:
+            header.append(n)
+        elif n < 1 << 16:
+            header.append(126)
+            header += struct.pack(">H", n)
+        else:
+            header.append(127)
+            header += struct.pack(">Q", n)
+        self.request.sendall(bytes(header) + payload)
+
+    def send(self, message: dict) -> None:
+        payload = json.dumps(message).encode("utf-8")
+        if len(payload) > FRAGMENT_BYTES:
+            self.send_frame(0x1, payload[:FRAGMENT_BYTES], final=False)
+            self.send_frame(0x0, payload[FRAGMENT_BYTES:])
+        else:
+            self.send_frame(0x1, payload)
+
+    # The protocol methods cdp.py uses
+
+    def dispatch(self, message: dict) -> None:
+        method, params, message_id = message["method"], message.get("params", {}), message["id"]
+        if method == "Page.enable":
+            self.send({"id": message_id, "result": {}})
+        elif method == "Page.navigate":
+            self.tab.url = params["url"]
+            # Events before and after the reply, and a ping in between, as Chrome does
+            self.send({"method": "Page.frameStartedLoading", "params": {"frameId": self.tab.id}})
+            self.send_frame(0x9, b"stub")
+            self.send({"id": message_id, "result": {"frameId": self.tab.id, "loaderId": "L1"}})
+            self.send({"method": "Page.domContentEventFired", "params": {"timestamp": 1.0}})
+            self.send({"method": "Page.loadEventFired", "params": {"timestamp": 2.0}})
+        elif method == "Runtime.evaluate":
+            self.send({"id": message_id, "result": self.evaluate(params["expression"])})
+        else:
+            self.send({"id": message_id, "error": {"code": -32601, "message": f"'{method}' wasn't found"}})
+
+    def evaluate(self, expression: str) -> dict:
+        if expression == "document.visibilityState":
+            return {"result": {"type": "string", "value": "visible" if self.tab.visible else "hidden"}}
+        repeat = re.fullmatch(r"'x'\.repeat\((\d+)\)", expression)
+        if repeat:
+            return {"result": {"type": "string", "value": "x" * int(repeat.group(1))}}
+        selector = re.search(r"querySelectorAll\((\".*?\")\)", expression)
+        if selector:
+            value = element_centers(fixture_for(self.tab.url), json.loads(selector.group(1)))
+            return {"result": {"type": "object", "value": value}}
+        return {
+            "result": {"type": "object", "subtype": "error"},
+            "exceptionDetails": {"text": "Uncaught SyntaxError: stub can't evaluate this"},
+        }
+
+
+def check(failures: list[str], name: str, ok: bool, detail: str = "") -> None:
+    print(f"  {'ok  ' if ok else 'FAIL'}  {name}" + (f": {detail}" if detail and not ok else ""))
+    if not ok:
+        failures.append(name)
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def run_checks() -> list[str]:
+    failures: list[str] = []
+    tabs = [
+        StubTab("bg", "https://x.com/notifications", visible=False),
+        StubTab("other", "https://example.com/", visible=True),
+        StubTab("main", "https://x.com/home", visible=True),
+    ]
+    with StubChrome(tabs) as stub:
+        print(f"Stub DevTools endpoint on 127.0.0.1:{stub.port}")
+        client = CDPClient.connect(stub.port, timeout=5)
+        check(failures, "connect picks the visible x.com tab", stub.attached[-1] == "main", f"attached {stub.attached}")
+
+        loaded = client.navigate("https://x.com/me/following", timeout=5)
+        check(failures, "navigate waits for the load event", loaded)
+        check(failures, "navigate changes the attached tab", stub.tabs["main"].url.endswith("/following"))
+        client.evaluate("document.visibilityState")
+        check(failures, "pings are answered", stub.pongs == [b"stub"], f"pongs {stub.pongs}")
+
+        original_get_client = cdp.get_client
+        cdp.get_client = lambda port=None: client
+        try:
+            unfollow = cdp.locate("unfollow")
+            check(
+                failures, "unfollow buttons in the viewport", unfollow == [(1229, 241), (1229, 329)], f"got {unfollow}"
+            )
+            follow = cdp.locate("follow")
+            check(failures, "follow selector skips unfollow buttons", follow == [(1219, 417)], f"got {follow}")
+
+            client.navigate("https://x.com/me/confirm", timeout=5)
+            confirm = cdp.locate("confirm")
+            check(failures, "confirm button in the dialog", confirm == [(960, 627)], f"got {confirm}")
+
+            client.navigate("https://x.com/target/followers", timeout=5)
+            column = Region(1000, 0, 400, 1080)
+            follow = cdp.locate("follow", region=column)
+            check(failures, "region filter", follow == [(1219, 251), (1219, 339)], f"got {follow}")
+
+            client.navigate("https://x.com/someone", timeout=5)
+            check(failures, "page without buttons", cdp.locate("unfollow") == [])
+        finally:
+            cdp.get_client = original_get_client
+
+        try:
+            client.call("Bogus.method")
+            check(failures, "protocol errors raise CDPError", False, "no exception")
+        except CDPError:
+            check(failures, "protocol errors raise CDPError", True)
+        try:
+            client.evaluate("throw new Error()")
+            check(failures, "script errors raise CDPError", False, "no exception")
+        except CDPError:
+            check(failures, "script errors raise CDPError", True)
+
+        for size, length in ((10_000, "16-bit"), (70_000, "64-bit")):
+            value = client.evaluate(f"'x'.repeat({size})")
+            check(failures, f"fragmented reply with a {length} length", value == "x" * size, f"got {len(value or '')} bytes")
+        client.close()
+
+    port = unused_port()
+    try:
+        CDPClient.connect(port, timeout=1)
+        check(failures, "unreachable port raises CDPError", False, "no exception")
+    except CDPError:
+        check(failures, "unreachable port raises CDPError", True)
+    check(failures, "get_client falls back to None", cdp.get_client(port) is None)
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check cdp.py against a stub DevTools server")
+    parser.parse_args(argv)
+
+    failures = run_checks()
+    if failures:
+        print(f"\n{len(failures)} check(s) failed", file=sys.stderr)
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+Offline benchmark for the button detectors.
+
+Runs the detectors from detection.py against a folder of saved screenshots
+and reports latency, peak memory, precision and recall for each matcher
+configuration. No screen, Chrome or pyautogui is needed.
+
+Corpus layout: every screenshot (``.png``/``.jpg``) has a sidecar JSON file
+with the same stem listing the ground-truth button centres per detector:
+
+    frame_001.png
+    frame_001.json   {"unfollow": [[1271, 132], [1271, 332]], "confirm": []}
+
+Detectors missing from a sidecar are not scored on that frame.
+
+Usage:
+    python -m bench.detect path/to/corpus --modes exhaustive,pyramid,fft --tolerances 0.7,0.8,0.9
+"""
+
+import argparse
+import inspect
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from detection import DETECTORS, TemplateStats
+from frame import Frame
+from image_rec import IMAGE_EXTENSIONS, MATCH_MODES
+
+
+def load_corpus(corpus_dir: Path) -> list[tuple[str, np.ndarray, dict[str, list[tuple[int, int]]]]]:
+    corpus = []
+    for image_path in sorted(corpus_dir.iterdir()):
+        if image_path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+        truth_path = image_path.with_suffix(".json")
+        if not truth_path.exists():
+            print(f"skipping {image_path.name}: no {truth_path.name}", file=sys.stderr)
+            continue
+        pixels = cv2.imread(str(image_path), cv2.IMREAD_COLOR)
+        if pixels is None:
+            print(f"skipping {image_path.name}: unreadable", file=sys.stderr)
+            continue
+        with open(truth_path, "r", encoding="utf-8") as f:
+            truth = {name: [tuple(c) for c in coords] for name, coords in json.load(f).items()}
+        corpus.append((image_path.name, pixels, truth))
+    return corpus
+
+
+def score_matches(
+    predicted: list[tuple[int, int]], expected: list[tuple[int, int]], radius: float
+) -> tuple[int, int, int]:
+    """Greedily pair predictions with ground truth; returns (true_pos, false_pos, false_neg)."""
+    unmatched = list(expected)
+    true_pos = 0
+    for x, y in predicted:
+        best = None
+        best_dist = radius * radius
+        for i, (ex, ey) in enumerate(unmatched):
+            dist = (x - ex) ** 2 + (y - ey) ** 2
+            if dist <= best_dist:
+                best, best_dist = i, dist
+        if best is not None:
+            unmatched.pop(best)
+            true_pos += 1
+    return true_pos, len(predicted) - true_pos, len(unmatched)
+
+
+def run_config(corpus, detector_name: str, mode: str, tolerance: float, repeat: int, radius: float) -> dict | None:
+    detector = DETECTORS[detector_name]
+    frames = [(pixels, truth[detector_name]) for _, pixels, truth in corpus if detector_name in truth]
+    if not frames:
+        return None
+
+    # Detectors that stop at the first hit learn a template order; keep it in
+    # memory so the benchmark neither reads nor overwrites the bot's own stats
+    extra = {"stats": TemplateStats(path=None)} if "stats" in inspect.signature(detector).parameters else {}
+
+    latencies = []
+    true_pos = false_pos = false_neg = 0
+    for pixels, expected in frames:
+        for _ in range(repeat):
+            frame = Frame(pixels, order="BGR")
+            start = time.perf_counter()
+            result = detector(frame, tolerance=tolerance, mode=mode, tracker=None, **extra)
+            latencies.append(time.perf_counter() - start)
+        tp, fp, fn = score_matches(result.coords, expected, radius)
+        true_pos += tp
+        false_pos += fp
+        false_neg += fn
+
+    tracemalloc.start()
+    peak = 0
+    for pixels, _ in frames:
+        frame = Frame(pixels, order="BGR")
+        tracemalloc.reset_peak()
+        detector(frame, tolerance=tolerance, mode=mode, tracker=None, **extra)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    predicted = true_pos + false_pos
+    actual = true_pos + false_neg
+    return {
+        "detector": detector_name,
+        "mode": mode,
+        "tolerance": tolerance,
+        "frames": len(frames),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "peak_mb": peak / (1024 * 1024),
+        "precision": true_pos / predicted if predicted else 1.0,
+        "recall": true_pos / actual if actual else 1.0,
+    }
+
+
+def print_table(rows: list[dict]) -> None:
+    header = f"{'detector':<10} {'mode':<11} {'tol':>5} {'frames':>6} {'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8} {'prec':>6} {'recall':>6}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(
+            f"{row['detector']:<10} {row['mode']:<11} {row['tolerance']:>5.2f} {row['frames']:>6} "
+            f"{row['p50_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['peak_mb']:>8.1f} "
+            f"{row['precision']:>6.3f} {row['recall']:>6.3f}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark button detectors on a screenshot corpus")
+    parser.add_argument("corpus", type=Path, help="Folder of screenshots with ground-truth JSON sidecars")
+    parser.add_argument("--detectors", default=",".join(DETECTORS), help="Comma-separated detectors to run")
+    parser.add_argument("--modes", default=",".join(MATCH_MODES), help="Comma-separated matching modes")
+    parser.add_argument("--tolerances", default="0.8", help="Comma-separated match thresholds")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per frame")
+    parser.add_argument("--radius", type=float, default=15, help="Max distance (px) for a hit to count as correct")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        print(f"No annotated screenshots found in {args.corpus}", file=sys.stderr)
+        return 1
+
+    rows = []
+    for detector_name in args.detectors.split(","):
+        for mode in args.modes.split(","):
+            for tolerance in (float(t) for t in args.tolerances.split(",")):
+                row = run_config(corpus, detector_name, mode, tolerance, args.repeat, args.radius)
+                if row is not None:
+                    rows.append(row)
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
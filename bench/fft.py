@@ -0,0 +1,107 @@
+"""
+Compare the FFT matcher with per-template matchTemplate on one frame.
+
+For every template folder under assets/ this times a full-frame pass both
+ways, single-threaded so the numbers compare the algorithms rather than the
+thread pool, and reports the largest score difference between the two
+score maps, overall and where either score could pass a threshold (>= 0.5).
+Near-flat windows are zeroed by the FFT matcher, so the overall figure can
+reach ~1e-2 while the part that matters should agree to ~1e-5.
+
+Usage:
+    python -m bench.fft                       # synthetic 1080p frame built from the templates
+    python -m bench.fft --frame shot.png --repeat 3
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from frame import Frame
+from image_rec import FrameSpectrum, Region, TemplateLibrary
+
+ASSETS_DIR = "assets"
+
+
+def synthetic_frame(templates, width: int = 1920, height: int = 1080) -> np.ndarray:
+    """White page with each template pasted once down the middle column."""
+    canvas = np.full((height, width, 3), 255, np.uint8)
+    y = 20
+    for template in templates:
+        if y + template.height >= height:
+            break
+        canvas[y:y + template.height, width // 2:width // 2 + template.width] = template.image
+        y += template.height + 20
+    return canvas
+
+
+def bench_folder(pixels: np.ndarray, templates, repeat: int) -> dict:
+    matchtemplate_s = []
+    fft_s = []
+    max_diff = 0.0
+    max_diff_relevant = 0.0
+    for _ in range(repeat):
+        frame = Frame(pixels, order="BGR")
+        start = time.perf_counter()
+        reference = [cv2.matchTemplate(frame.bgr, t.image, cv2.TM_CCOEFF_NORMED) for t in templates]
+        matchtemplate_s.append(time.perf_counter() - start)
+
+        frame = Frame(pixels, order="BGR")
+        start = time.perf_counter()
+        spectrum = FrameSpectrum(frame, Region.of_frame(frame))
+        scores = [spectrum.score_map(t) for t in templates]
+        fft_s.append(time.perf_counter() - start)
+
+        for expected, actual in zip(reference, scores):
+            diff = np.abs(expected - actual)
+            max_diff = max(max_diff, float(diff.max()))
+            max_diff_relevant = max(max_diff_relevant, float(diff[np.maximum(expected, actual) >= 0.5].max(initial=0)))
+
+    return {
+        "templates": len(templates),
+        "matchtemplate_ms": float(np.median(matchtemplate_s)) * 1000,
+        "fft_ms": float(np.median(fft_s)) * 1000,
+        "max_score_diff": max_diff,
+        "max_score_diff_relevant": max_diff_relevant,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark FFT matching against matchTemplate")
+    parser.add_argument("--frame", type=Path, help="Screenshot to match against (default: synthetic)")
+    parser.add_argument("--assets", type=Path, default=Path(ASSETS_DIR), help="Folder of template folders")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per folder")
+    args = parser.parse_args(argv)
+
+    folders = [folder for folder in sorted(args.assets.iterdir()) if folder.is_dir()]
+    libraries = {folder.name: TemplateLibrary(str(folder)).templates for folder in folders}
+    libraries = {name: templates for name, templates in libraries.items() if templates}
+    if not libraries:
+        print(f"No templates found under {args.assets}", file=sys.stderr)
+        return 1
+
+    if args.frame:
+        pixels = cv2.imread(str(args.frame), cv2.IMREAD_COLOR)
+        if pixels is None:
+            print(f"Could not read {args.frame}", file=sys.stderr)
+            return 1
+    else:
+        pixels = synthetic_frame([t for templates in libraries.values() for t in templates])
+
+    print(f"{'folder':<36} {'tmpl':>5} {'matchTemplate ms':>17} {'fft ms':>9} {'speedup':>8} {'max diff':>9} {'diff>=0.5':>10}")
+    for name, templates in libraries.items():
+        row = bench_folder(pixels, templates, args.repeat)
+        print(
+            f"{name:<36} {row['templates']:>5} {row['matchtemplate_ms']:>17.1f} {row['fft_ms']:>9.1f} "
+            f"{row['matchtemplate_ms'] / row['fft_ms']:>7.2f}x {row['max_score_diff']:>9.5f} "
+            f"{row['max_score_diff_relevant']:>10.6f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Check that starting the CLI stays cheap.
+
+The CLI is run from a scheduler many times a day, so `cli.py --help` or a
+mistyped argument should not pay for cv2, numpy, pyautogui or loading the
+template libraries. This imports cli in a fresh interpreter under
+``-X importtime`` from an empty working directory and reports the slowest
+imports, then fails if a heavy module was pulled in, importing cli took
+longer than --budget-ms, or the import created files (e.g. logs/).
+
+Usage:
+    python -m bench.startup
+    python -m bench.startup --budget-ms 80 --top 15
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# Modules that only a running command needs
+HEAVY_MODULES = [
+    "cv2",
+    "numpy",
+    "pyautogui",
+    "pygetwindow",
+    "follow_random",
+    "unfollow_all",
+    "detection",
+    "image_rec",
+    "logger",
+    "csv_logger",
+]
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map each imported module to its (self, cumulative) import time in microseconds."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure how long importing the CLI takes")
+    parser.add_argument("--budget-ms", type=float, default=100, help="Maximum cumulative import time of cli")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of `cli.py --help` to time")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(REPO_DIR), os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import cli"],
+            cwd=workdir, env=env, capture_output=True, text=True,
+        )
+        created = sorted(os.listdir(workdir))
+
+        help_s = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(REPO_DIR / "cli.py"), "--help"],
+                cwd=workdir, env=env, capture_output=True, check=True,
+            )
+            help_s.append(time.perf_counter() - start)
+
+    times = parse_importtime(result.stderr)
+    if result.returncode != 0 or "cli" not in times:
+        print(result.stderr.splitlines()[-1] if result.stderr else "import cli failed", file=sys.stderr)
+        return 1
+
+    cli_ms = times["cli"][1] / 1000
+    print(f"import cli: {cli_ms:.1f} ms cumulative, {len(times)} modules")
+    print(f"cli.py --help: {min(help_s) * 1000:.0f} ms best of {args.repeat} (including interpreter startup)")
+    print(f"\n{'self ms':>8} {'cumul ms':>9}  module")
+    for name, (self_us, cumulative_us) in sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>8.1f} {cumulative_us / 1000:>9.1f}  {name}")
+
+    failures = []
+    heavy = [name for name in HEAVY_MODULES if name in times]
+    if heavy:
+        failures.append(f"importing cli pulls in {', '.join(heavy)}")
+    if cli_ms > args.budget_ms:
+        failures.append(f"importing cli took {cli_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if created:
+        failures.append(f"importing cli created {', '.join(created)} in the working directory")
+
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
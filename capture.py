@@ -0,0 +1,268 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+import cv2
+import numpy as np
+
+from constants import CAPTURE_BACKEND, REPLAY_SOURCE
+from frame import Frame, FrameBuffers
+from image_rec import IMAGE_EXTENSIONS, Region, RegionTracker
+from metrics import span
+
+# Grayscale difference (0-255) above which a thumbnail pixel counts as changed
+PIXEL_CHANGE_LEVEL = 12
+
+
+class FrameSource(ABC):
+    """Something that produces screen frames: the live screen, or a recording."""
+
+    # False for recordings, where every grab consumes a frame and waiting
+    # for the picture to change is meaningless
+    live = True
+
+    @abstractmethod
+    def grab(self, region: Region | None = None) -> Frame:
+        """Capture the screen (or just a region of it) as a Frame."""
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "FrameSource":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PyAutoGuiSource(FrameSource):
+    """Captures the screen with pyautogui.screenshot (PIL under the hood)."""
+
+    def __init__(self):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+        self._buffers = FrameBuffers()
+
+    def grab(self, region: Region | None = None) -> Frame:
+        timestamp = time.time()
+        if region is None:
+            return Frame(self._pyautogui.screenshot(), timestamp=timestamp, buffers=self._buffers)
+        image = self._pyautogui.screenshot(region=tuple(region))
+        return Frame(image, timestamp=timestamp, left=region.left, top=region.top, buffers=self._buffers)
+
+
+class MssSource(FrameSource):
+    """
+    Captures the screen with mss, which reads the framebuffer through shared
+    memory (XShm on Linux, BitBlt/CoreGraphics elsewhere) and can grab a region
+    without capturing the whole display first.
+
+    Requires the optional ``mss`` package. An mss handle may only be used by
+    the thread that created it, so each capturing thread gets its own.
+    """
+
+    def __init__(self, monitor: int = 1):
+        try:
+            import mss
+        except ImportError as e:
+            raise ImportError("The mss capture backend requires the 'mss' package (pip install mss)") from e
+
+        self._mss = mss.mss
+        self._local = threading.local()
+        self._handles = []
+        self._buffers = FrameBuffers()
+        self._monitor = self._sct.monitors[monitor]
+
+    @property
+    def _sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = self._local.sct = self._mss()
+            self._handles.append(sct)
+        return sct
+
+    def grab(self, region: Region | None = None) -> Frame:
+        if region is None:
+            area = self._monitor
+        else:
+            area = {"left": region.left, "top": region.top, "width": region.width, "height": region.height}
+
+        timestamp = time.time()
+        shot = self._sct.grab(area)
+        pixels = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return Frame(pixels, timestamp=timestamp, order="BGRA", left=shot.left, top=shot.top, buffers=self._buffers)
+
+    def close(self) -> None:
+        for sct in self._handles:
+            sct.close()
+        self._handles.clear()
+        self._local = threading.local()
+
+
+class ReplaySource(FrameSource):
+    """
+    Replays recorded frames from a directory of screenshots or a video file.
+
+    Frames are yielded in order (sorted by filename for directories). Once the
+    recording is exhausted the last frame is returned again, like a screen that
+    stopped changing, unless loop is set.
+    """
+
+    live = False
+
+    def __init__(self, path: str, loop: bool = False):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Replay source not found: {path}")
+        self.path = path
+        self.loop = loop
+        self._frames = self.frames()
+        self._last: np.ndarray | None = None
+        self._buffers = FrameBuffers()
+
+    def _read(self) -> Iterator[np.ndarray]:
+        if os.path.isdir(self.path):
+            for image_file in sorted(os.listdir(self.path)):
+                if not image_file.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                pixels = cv2.imread(os.path.join(self.path, image_file), cv2.IMREAD_COLOR)
+                if pixels is not None:
+                    yield pixels
+        else:
+            video = cv2.VideoCapture(self.path)
+            try:
+                while True:
+                    ok, pixels = video.read()
+                    if not ok:
+                        break
+                    yield pixels
+            finally:
+                video.release()
+
+    def frames(self) -> Iterator[np.ndarray]:
+        while True:
+            produced = False
+            for pixels in self._read():
+                produced = True
+                yield pixels
+            if not (self.loop and produced):
+                return
+
+    def grab(self, region: Region | None = None) -> Frame:
+        pixels = next(self._frames, None)
+        if pixels is None:
+            if self._last is None:
+                raise ValueError(f"Replay source has no frames: {self.path}")
+            pixels = self._last
+        self._last = pixels
+
+        if region is None:
+            return Frame(pixels, order="BGR", buffers=self._buffers)
+        bounds = Region(0, 0, pixels.shape[1], pixels.shape[0])
+        left, top, width, height = region.intersect(bounds)
+        return Frame(pixels[top:top + height, left:left + width], order="BGR", left=left, top=top, buffers=self._buffers)
+
+
+def create_frame_source(backend: str = CAPTURE_BACKEND) -> FrameSource:
+    if backend == "pyautogui":
+        return PyAutoGuiSource()
+    if backend == "mss":
+        return MssSource()
+    if backend == "replay":
+        return ReplaySource(REPLAY_SOURCE)
+    raise ValueError(f"Unknown capture backend {backend!r}, expected 'pyautogui', 'mss' or 'replay'")
+
+
+_frame_source: FrameSource | None = None
+
+
+def get_frame_source() -> FrameSource:
+    global _frame_source
+    if _frame_source is None:
+        _frame_source = create_frame_source()
+    return _frame_source
+
+
+def set_frame_source(source: FrameSource) -> None:
+    global _frame_source
+    _frame_source = source
+
+
+def capture_frame(region: Region | None = None) -> Frame:
+    with span("capture"):
+        return get_frame_source().grab(region)
+
+
+@span("wait")
+def wait_for_stable(
+    frame_source: FrameSource | None = None,
+    roi: Region | None = None,
+    tracker: RegionTracker | None = None,
+    timeout: float = 3.0,
+    min_wait: float = 0.0,
+    interval: float = 0.1,
+    quiet_time: float = 0.5,
+    threshold: float = 0.0,
+    scale: float = 0.25,
+) -> bool:
+    """
+    Wait until the screen stops changing, or until the timeout runs out.
+
+    Frames are downscaled to a thumbnail before comparing, so each check costs
+    a capture plus a few microseconds of arithmetic. The timeout should be the
+    old fixed sleep: in the worst case this waits exactly as long as before.
+    Recordings (sources that aren't live) return at once without consuming
+    frames.
+
+    Args:
+        frame_source: Where to capture from (defaults to the active source)
+        roi: Only watch this region of the screen
+        tracker: Watch the region this button tracker has configured or
+            learned (the whole screen until it has one); ignored if roi is given
+        timeout: Upper bound on the wait in seconds
+        min_wait: Always wait at least this long, e.g. for navigation to start
+        interval: Pause between captures in seconds
+        quiet_time: How long the screen must stay unchanged to call it settled
+        threshold: Fraction of thumbnail pixels that may change between captures
+            while still counting as unchanged
+        scale: Downscale factor applied before diffing
+
+    Returns:
+        True if the screen settled, False if the timeout was reached
+    """
+    source = frame_source or get_frame_source()
+    if not source.live:
+        return True
+    start = time.monotonic()
+    deadline = start + timeout
+    if min_wait > 0:
+        time.sleep(min(min_wait, timeout))
+
+    if roi is None and tracker is not None:
+        roi = tracker.region(source.grab())
+
+    previous = None
+    quiet_since = None
+    while True:
+        captured_at = time.monotonic()
+        frame = source.grab(roi)
+        small = cv2.resize(frame.pixels, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        thumbnail = Frame(small, order=frame.order).gray
+
+        if previous is not None and previous.shape == thumbnail.shape:
+            changed = np.count_nonzero(cv2.absdiff(previous, thumbnail) > PIXEL_CHANGE_LEVEL)
+            if changed <= threshold * thumbnail.size:
+                if quiet_since is None:
+                    quiet_since = previous_at
+                if captured_at - quiet_since >= quiet_time:
+                    return True
+            else:
+                quiet_since = None
+        previous, previous_at = thumbnail, captured_at
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
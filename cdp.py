@@ -0,0 +1,358 @@
+"""
+Drives Chrome through the DevTools protocol instead of the keyboard and screen.
+
+When Chrome is started with a remote-debugging port (CDP_PORT in config),
+pages are opened with Page.navigate rather than by typing the URL into the
+address bar, and buttons are located from the DOM (bounding boxes converted
+to screen coordinates) rather than by template matching. Callers treat a
+None/False result as "not available" and fall back to the pyautogui and
+image-recognition paths, so the bot behaves as before when the port is off
+or unreachable.
+
+Only the standard library is used: a minimal RFC 6455 WebSocket client
+carries the protocol's JSON messages.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import socket
+import struct
+import time
+import urllib.request
+from typing import Any
+from urllib.parse import urlparse
+
+from constants import CDP_PORT
+from image_rec import Region
+from logger import setup_logger
+
+logger = setup_logger()
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+TWITTER_HOSTS = ("x.com", "www.x.com", "mobile.x.com", "twitter.com", "www.twitter.com", "mobile.twitter.com")
+
+# Twitter marks its buttons with stable data-testid attributes
+SELECTORS = {
+    "unfollow": '[data-testid$="-unfollow"]',
+    "confirm": '[data-testid="confirmationSheetConfirm"]',
+    "follow": '[data-testid$="-follow"]',
+}
+
+# Centres of the matching elements that are visible in the viewport, in screen
+# pixels. The content area's screen position is derived from the window's
+# outer and inner sizes, which assumes 100% page zoom and borders of equal
+# width on the left, right and bottom.
+ELEMENT_CENTERS_JS = """
+(() => {
+  const dpr = window.devicePixelRatio || 1;
+  const border = (window.outerWidth - window.innerWidth) / 2;
+  const left = window.screenX + border;
+  const top = window.screenY + window.outerHeight - window.innerHeight - border;
+  return Array.from(document.querySelectorAll(%s))
+    .map(el => el.getBoundingClientRect())
+    .filter(r => r.width > 0 && r.height > 0 && r.bottom > 0 && r.top < window.innerHeight)
+    .map(r => [Math.round((left + r.left + r.width / 2) * dpr), Math.round((top + r.top + r.height / 2) * dpr)]);
+})()
+"""
+
+
+class CDPError(Exception):
+    """The DevTools endpoint is unreachable, closed the connection or returned an error."""
+
+
+class WebSocket:
+    """Blocking client side of a WebSocket connection (text messages only)."""
+
+    def __init__(self, url: str, timeout: float = 10.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        path = parsed.path or "/"
+        if parsed.query:
+            path += f"?{parsed.query}"
+
+        self._sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        self._buffer = bytearray()
+        self._handshake(path)
+
+    def _handshake(self, path: str) -> None:
+        key = base64.b64encode(os.urandom(16)).decode()
+        request = (
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {self.host}:{self.port}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {key}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        )
+        self._sock.sendall(request.encode())
+
+        while b"\r\n\r\n" not in self._buffer:
+            self._fill()
+        head, _, rest = bytes(self._buffer).partition(b"\r\n\r\n")
+        self._buffer = bytearray(rest)
+
+        lines = head.decode("latin-1").split("\r\n")
+        if " 101 " not in f"{lines[0]} ":
+            raise CDPError(f"WebSocket upgrade refused: {lines[0]}")
+        headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+        expected = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        if headers.get("sec-websocket-accept") != expected:
+            raise CDPError("WebSocket handshake returned a bad Sec-WebSocket-Accept")
+
+    def _fill(self) -> None:
+        chunk = self._sock.recv(65536)
+        if not chunk:
+            raise CDPError("Connection closed by Chrome")
+        self._buffer += chunk
+
+    def _read_exact(self, n: int) -> bytes:
+        while len(self._buffer) < n:
+            self._fill()
+        data = bytes(self._buffer[:n])
+        del self._buffer[:n]
+        return data
+
+    @staticmethod
+    def _mask(payload: bytes, key: bytes) -> bytes:
+        n = len(payload)
+        if n == 0:
+            return payload
+        mask = (key * (n // 4 + 1))[:n]
+        return (int.from_bytes(payload, "big") ^ int.from_bytes(mask, "big")).to_bytes(n, "big")
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        # Client frames are always masked (RFC 6455, section 5.3)
+        header = bytearray([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header.append(0x80 | n)
+        elif n < 1 << 16:
+            header.append(0x80 | 126)
+            header += struct.pack(">H", n)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack(">Q", n)
+        key = os.urandom(4)
+        self._sock.sendall(bytes(header) + key + self._mask(payload, key))
+
+    def send_text(self, text: str) -> None:
+        self._send_frame(0x1, text.encode("utf-8"))
+
+    def recv_text(self) -> str:
+        fragments = []
+        while True:
+            first, second = self._read_exact(2)
+            opcode = first & 0x0F
+            n = second & 0x7F
+            if n == 126:
+                n = struct.unpack(">H", self._read_exact(2))[0]
+            elif n == 127:
+                n = struct.unpack(">Q", self._read_exact(8))[0]
+            key = self._read_exact(4) if second & 0x80 else None
+            payload = self._read_exact(n)
+            if key is not None:
+                payload = self._mask(payload, key)
+
+            if opcode == 0x8:
+                raise CDPError("Chrome closed the DevTools connection")
+            if opcode == 0x9:
+                self._send_frame(0xA, payload)
+                continue
+            if opcode == 0xA:
+                continue
+            fragments.append(payload)
+            if first & 0x80:
+                return b"".join(fragments).decode("utf-8")
+
+    def close(self) -> None:
+        try:
+            self._send_frame(0x8, b"")
+        except OSError:
+            pass
+        self._sock.close()
+
+
+class CDPClient:
+    """
+    A DevTools session attached to one page (tab).
+
+    Args:
+        ws_url: The page's webSocketDebuggerUrl
+        timeout: Socket timeout for every call (seconds)
+    """
+
+    def __init__(self, ws_url: str, timeout: float = 10.0):
+        self._ws = WebSocket(ws_url, timeout)
+        self._next_id = 0
+        self._events: list[dict] = []
+
+    @classmethod
+    def connect(cls, port: int, host: str = "127.0.0.1", timeout: float = 10.0) -> "CDPClient":
+        """
+        Attach to the tab the bot is driving in the Chrome listening on host:port.
+
+        /json/list doesn't say which tab is in front, and the first entry can
+        be a background tab, so each page is asked for its visibility. A
+        visible x.com tab wins, then any visible tab, then an x.com tab,
+        then the first page.
+        """
+        try:
+            with urllib.request.urlopen(f"http://{host}:{port}/json/list", timeout=timeout) as response:
+                targets = json.load(response)
+        except (OSError, ValueError) as e:
+            raise CDPError(f"No DevTools endpoint on {host}:{port}: {e}") from e
+        pages = [t for t in targets if t.get("type") == "page" and t.get("webSocketDebuggerUrl")]
+        if not pages:
+            raise CDPError(f"No open page on {host}:{port}")
+
+        best, best_rank = None, None
+        for page in pages:
+            try:
+                client = cls(page["webSocketDebuggerUrl"], timeout)
+                visible = client.evaluate("document.visibilityState") == "visible"
+            except (CDPError, OSError):
+                continue
+            rank = (visible, urlparse(page.get("url", "")).hostname in TWITTER_HOSTS)
+            if best_rank is None or rank > best_rank:
+                if best is not None:
+                    best.close()
+                best, best_rank = client, rank
+            else:
+                client.close()
+        if best is None:
+            return cls(pages[0]["webSocketDebuggerUrl"], timeout)
+        return best
+
+    def call(self, method: str, **params) -> dict:
+        """Send a command and return its result; events that arrive meanwhile are kept for wait_event."""
+        self._next_id += 1
+        message_id = self._next_id
+        self._ws.send_text(json.dumps({"id": message_id, "method": method, "params": params}))
+        while True:
+            message = json.loads(self._ws.recv_text())
+            if message.get("id") == message_id:
+                if "error" in message:
+                    raise CDPError(f"{method} failed: {message['error'].get('message', message['error'])}")
+                return message.get("result", {})
+            if "method" in message:
+                self._events.append(message)
+
+    def wait_event(self, method: str, timeout: float) -> dict | None:
+        deadline = time.monotonic() + timeout
+        while True:
+            for i, event in enumerate(self._events):
+                if event["method"] == method:
+                    return self._events.pop(i)
+            self._events.clear()
+            if time.monotonic() >= deadline:
+                return None
+            try:
+                message = json.loads(self._ws.recv_text())
+            except socket.timeout:
+                return None
+            if "method" in message:
+                self._events.append(message)
+
+    def evaluate(self, expression: str) -> Any:
+        result = self.call("Runtime.evaluate", expression=expression, returnByValue=True)
+        if "exceptionDetails" in result:
+            raise CDPError(f"Script error: {result['exceptionDetails'].get('text', 'unknown')}")
+        return result.get("result", {}).get("value")
+
+    def navigate(self, url: str, timeout: float = 15.0) -> bool:
+        """Open url in the attached tab and wait for its load event; False if it timed out."""
+        self.call("Page.enable")
+        self._events.clear()
+        result = self.call("Page.navigate", url=url)
+        if result.get("errorText"):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        return self.wait_event("Page.loadEventFired", timeout) is not None
+
+    def element_centers(self, selector: str) -> list[tuple[int, int]]:
+        """Screen coordinates of the centre of every visible element matching a CSS selector."""
+        centers = self.evaluate(ELEMENT_CENTERS_JS % json.dumps(selector)) or []
+        return [(int(x), int(y)) for x, y in centers]
+
+    def close(self) -> None:
+        self._ws.close()
+
+
+_client: CDPClient | None = None
+
+
+def get_client(port: int | None = CDP_PORT) -> CDPClient | None:
+    """The shared DevTools session, connecting on first use; None if the backend is off or unreachable."""
+    global _client
+    if port is None:
+        return None
+    if _client is None:
+        try:
+            _client = CDPClient.connect(port)
+        except (CDPError, OSError) as e:
+            logger.debug(f"DevTools backend unavailable: {e}")
+            return None
+    return _client
+
+
+def _drop_client() -> None:
+    global _client
+    if _client is not None:
+        try:
+            _client.close()
+        except OSError:
+            pass
+        _client = None
+
+
+def navigate(url: str, timeout: float = 15.0) -> bool:
+    """
+    Open url through DevTools.
+
+    Returns:
+        True if the page loaded; False if the backend is off or failed, in
+        which case the caller should navigate by typing the URL
+    """
+    client = get_client()
+    if client is None:
+        return False
+    try:
+        loaded = client.navigate(url, timeout)
+    except (CDPError, OSError) as e:
+        logger.warning(f"DevTools navigation failed, falling back to the address bar: {e}")
+        _drop_client()
+        return False
+    if not loaded:
+        logger.warning(f"Page load event for {url} not seen within {timeout:.0f}s")
+    return True
+
+
+def locate(name: str, region: Region | None = None) -> list[tuple[int, int]] | None:
+    """
+    Find buttons of one kind ("unfollow", "confirm" or "follow") from the DOM.
+
+    Args:
+        name: Key into SELECTORS
+        region: Only keep buttons inside this part of the screen
+
+    Returns:
+        Button centres in screen coordinates, or None if the backend is off
+        or failed (fall back to image recognition). An empty list means the
+        DOM has no such button on screen, which also warrants a fallback.
+    """
+    client = get_client()
+    if client is None:
+        return None
+    try:
+        coords = client.element_centers(SELECTORS[name])
+    except (CDPError, OSError) as e:
+        logger.warning(f"DevTools lookup for {name} buttons failed: {e}")
+        _drop_client()
+        return None
+    if region is not None:
+        left, top, width, height = region
+        coords = [(x, y) for x, y in coords if left <= x < left + width and top <= y < top + height]
+    return coords
@@ -0,0 +1,151 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CHECKPOINT_DB = "cache/checkpoints.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    command TEXT NOT NULL,
+    status TEXT NOT NULL,
+    goal INTEGER,
+    progress INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT '{}',
+    started_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS processed_targets (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    target TEXT NOT NULL,
+    processed_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, target)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    operation TEXT NOT NULL,
+    target TEXT NOT NULL,
+    success INTEGER NOT NULL,
+    details TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_command_status ON sessions (command, status);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class CheckpointStore:
+    """
+    SQLite store of run progress so an interrupted follow/unfollow run can resume.
+
+    The database runs in WAL mode with synchronous=NORMAL: each checkpoint is a
+    small append that doesn't block readers, and a crash loses at most the
+    last few writes rather than corrupting the file.
+    """
+
+    def __init__(self, path: str = CHECKPOINT_DB):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def start_session(self, command: str, goal: int | None = None) -> "Session":
+        now = _now()
+        cursor = self._execute(
+            "INSERT INTO sessions (command, status, goal, started_at, updated_at) VALUES (?, 'running', ?, ?, ?)",
+            (command, goal, now, now),
+        )
+        return Session(self, cursor.lastrowid, command, goal, 0, {})
+
+    def latest_unfinished(self, command: str) -> "Session | None":
+        row = self._execute(
+            "SELECT * FROM sessions WHERE command = ? AND status != 'completed' ORDER BY id DESC LIMIT 1",
+            (command,),
+        ).fetchone()
+        if row is None:
+            return None
+        return Session(self, row["id"], row["command"], row["goal"], row["progress"], json.loads(row["state"]))
+
+    def resume_or_start(self, command: str, resume: bool, goal: int | None = None) -> "Session":
+        """
+        Pick up the most recent unfinished session of this command, or start a new one.
+
+        Args:
+            command: "follow" or "unfollow"
+            resume: Look for an unfinished session first
+            goal: Target count for the run; when resuming, None keeps the stored one
+        """
+        if resume:
+            session = self.latest_unfinished(command)
+            if session is not None:
+                if goal is not None:
+                    session.goal = goal
+                self._execute(
+                    "UPDATE sessions SET status = 'running', goal = ?, updated_at = ? WHERE id = ?",
+                    (session.goal, _now(), session.id),
+                )
+                return session
+        return self.start_session(command, goal)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Session:
+    """Progress of one run, written through to the checkpoint store as it changes."""
+
+    def __init__(self, store: CheckpointStore, session_id: int, command: str, goal: int | None, progress: int, state: dict):
+        self.store = store
+        self.id = session_id
+        self.command = command
+        self.goal = goal
+        self.progress = progress
+        self.state = state
+
+    def save_progress(self, progress: int, **state) -> None:
+        self.progress = progress
+        self.state.update(state)
+        self.store._execute(
+            "UPDATE sessions SET progress = ?, state = ?, updated_at = ? WHERE id = ?",
+            (progress, json.dumps(self.state), _now(), self.id),
+        )
+
+    def record_attempt(self, operation: str, target: str, success: bool, details: str = "") -> None:
+        self.store._execute(
+            "INSERT INTO attempts (session_id, operation, target, success, details, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (self.id, operation, target, int(success), details, _now()),
+        )
+
+    def mark_processed(self, target: str) -> None:
+        self.store._execute(
+            "INSERT OR IGNORE INTO processed_targets (session_id, target, processed_at) VALUES (?, ?, ?)",
+            (self.id, target, _now()),
+        )
+
+    def is_processed(self, target: str) -> bool:
+        row = self.store._execute(
+            "SELECT 1 FROM processed_targets WHERE session_id = ? AND target = ?",
+            (self.id, target),
+        ).fetchone()
+        return row is not None
+
+    def finish(self, status: str = "completed") -> None:
+        self.store._execute(
+            "UPDATE sessions SET status = ?, updated_at = ? WHERE id = ?",
+            (status, _now(), self.id),
+        )
@@ -3,6 +3,8 @@ import sys
 import shutil
 import subprocess
 import platform
+import time
+import urllib.request
 from pathlib import Path
 
 from logger import setup_logger
@@ -74,6 +76,89 @@ def find_chrome_executable() -> str | None:
     return None
 
 
+CHROME_PROCESS_NAMES = [
+    "chrome",
+    "google-chrome",
+    "google-chrome-stable",
+    "chromium",
+    "chromium-browser",
+]
+
+
+def is_chrome_running() -> bool:
+    """
+    Check whether a Chrome/Chromium process exists (best-effort).
+
+    Matches exact process names, so helpers such as chrome_crashpad_handler
+    (left behind after Chrome exits) and scripts with "chrome" in their
+    command line don't count.
+    """
+    system = platform.system()
+    try:
+        if system == "Windows":
+            result = subprocess.run(
+                ["tasklist", "/FI", "IMAGENAME eq chrome.exe", "/NH"],
+                capture_output=True,
+                text=True,
+            )
+            return "chrome.exe" in result.stdout.lower()
+        names = ["Google Chrome", "Chromium"] if system == "Darwin" else CHROME_PROCESS_NAMES
+        for name in names:
+            # Linux truncates process names to 15 characters (e.g. "chromium-browse")
+            result = subprocess.run(
+                ["pgrep", "-x", name if system == "Darwin" else name[:15]],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            if result.returncode == 0:
+                return True
+    except Exception:
+        pass
+    return False
+
+
+def debugging_port_ready(port: int) -> bool:
+    """
+    True if Chrome's remote-debugging endpoint on localhost answers.
+    """
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/version", timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def wait_for_chrome(
+    timeout: float = 15.0, debugging_port: int | None = None, interval: float = 0.1
+) -> bool:
+    """
+    Poll until Chrome is ready for input instead of sleeping a fixed time.
+    Returns True once ready, False if the timeout expired first.
+
+    Args:
+        timeout: Maximum seconds to wait.
+        debugging_port: If Chrome was started with a remote-debugging port,
+            wait for it to answer; otherwise wait for a Chrome window to
+            appear (which also means the process is up).
+        interval: Seconds between checks.
+    """
+    # Imported here so launching Chrome doesn't need a display until we poll for its window
+    from window import get_chrome_window
+
+    deadline = time.monotonic() + timeout
+    while True:
+        if debugging_port is not None:
+            ready = debugging_port_ready(debugging_port)
+        else:
+            ready = get_chrome_window() is not None
+        if ready:
+            return True
+        if time.monotonic() >= deadline:
+            logger.warning(f"Chrome not ready after {timeout:.0f}s, continuing anyway")
+            return False
+        time.sleep(interval)
+
+
 def kill_existing_chrome() -> None:
     """
     Force-terminate all running Chrome processes (best-effort).
@@ -103,13 +188,7 @@ def kill_existing_chrome() -> None:
         else:
             # Linux
             # Try common process names
-            for name in [
-                "chrome",
-                "google-chrome",
-                "google-chrome-stable",
-                "chromium",
-                "chromium-browser",
-            ]:
+            for name in CHROME_PROCESS_NAMES:
                 subprocess.run(
                     ["pkill", "-f", name],
                     stdout=subprocess.DEVNULL,
@@ -121,17 +200,29 @@ def kill_existing_chrome() -> None:
 
 
 def launch_chrome(
-    url: str | None = None, incognito: bool = False, user_data_dir: str | None = None
+    url: str | None = None,
+    incognito: bool = False,
+    user_data_dir: str | None = None,
+    reuse: bool = False,
+    debugging_port: int | None = None,
 ) -> subprocess.Popen | None:
     """
     Kills existing Chrome instances, then launches a fresh one.
-    Returns the Popen object for the Chrome process (or None if Chrome not found).
+    Returns the Popen object for the Chrome process (or None if Chrome not
+    found, or if an existing instance was reused).
 
     Args:
         url: Optional URL to open on launch.
         incognito: Launch in incognito mode if True.
         user_data_dir: Path to a profile directory (launches with that profile).
+        reuse: Attach to an already-running Chrome instead of restarting it;
+            a fresh one is still launched if none is running.
+        debugging_port: Open the DevTools protocol on this localhost port (see cdp.py).
     """
+    if reuse and is_chrome_running():
+        logger.info("Reusing the running Chrome instance.")
+        return None
+
     chrome_path = find_chrome_executable()
     if not chrome_path:
         logger.error("Chrome executable not found. Please install Chrome or add it to PATH.")
@@ -146,6 +237,8 @@ def launch_chrome(
         args.append("--incognito")
     if user_data_dir:
         args.append(f"--user-data-dir={user_data_dir}")
+    if debugging_port is not None:
+        args.append(f"--remote-debugging-port={debugging_port}")
     if url:
         args.append(url)
 
@@ -176,5 +269,5 @@ def launch_chrome(
 # Example usage:
 if __name__ == "__main__":
     proc = launch_chrome(url="https://example.com", incognito=False)
-    if proc:
+    if proc and wait_for_chrome():
         logger.info("Chrome launched.")
@@ -1,27 +1,80 @@
 import argparse
-import time
 
-from chrome import launch_chrome
-from follow_random import follow_random
-from logger import setup_logger
-from unfollow_all import main as unfollow_all_main
+from constants import CDP_PORT, CHROME_PROFILE_DIR, REUSE_CHROME
 
-logger = setup_logger()
+# Command modules (and through them cv2, numpy, pyautogui and the template
+# libraries) are imported inside the handlers, so --help and argument errors
+# return immediately. Keep heavy imports out of this module's top level;
+# bench/startup.py checks that.
+
+
+def get_logger():
+    """The shared application logger, set up on first use rather than at import."""
+    from logger import setup_logger
+
+    return setup_logger()
+
+
+def start_chrome(args):
+    from chrome import debugging_port_ready, launch_chrome, wait_for_chrome
+
+    process = launch_chrome(
+        url="https://example.com",
+        incognito=False,
+        user_data_dir=CHROME_PROFILE_DIR,
+        reuse=args.reuse_chrome,
+        debugging_port=CDP_PORT,
+    )
+    debugging_port = CDP_PORT
+    # A reused Chrome only has the port if it was started with it; don't wait for one that never opens
+    if process is None and debugging_port is not None and not debugging_port_ready(debugging_port):
+        get_logger().warning(
+            f"Chrome is not listening on DevTools port {debugging_port} (started without "
+            "--remote-debugging-port?); CDP navigation is unavailable, using the address bar "
+            "and image recognition"
+        )
+        debugging_port = None
+    wait_for_chrome(debugging_port=debugging_port)
 
 
 def cmd_unfollow(args):
-    logger.info("Starting unfollow all process...")
-    launch_chrome(url="https://example.com", incognito=False)
-    time.sleep(3)
-    unfollow_all_main()
+    from unfollow_all import main as unfollow_all_main
+
+    get_logger().info("Starting unfollow all process...")
+    start_chrome(args)
+    unfollow_all_main(resume=args.resume)
 
 
 def cmd_follow(args):
+    from follow_random import follow_random, resumable_goal
+
     count = args.count
-    logger.info(f"Starting follow process for {count} users...")
-    launch_chrome(url="https://example.com", incognito=False)
-    time.sleep(3)
-    follow_random(count=count)
+    if count is None and not args.resume:
+        args.parser.error("a count is required unless --resume is given")
+    if count is None:
+        # Resolved before Chrome is restarted or a session row is written
+        count = resumable_goal()
+        if count is None:
+            args.parser.error("no unfinished follow session to resume; pass a count")
+        get_logger().info(f"Resuming the last follow session ({count} users)...")
+    else:
+        get_logger().info(f"Starting follow process for {count} users...")
+    start_chrome(args)
+    follow_random(count=count, resume=args.resume)
+
+
+def cmd_stats(args):
+    from metrics import format_run_summary, load_runs
+
+    runs = load_runs(args.file)
+    if args.command_filter:
+        runs = [run for run in runs if run["command"] == args.command_filter]
+    if not runs:
+        print(f"No runs recorded in {args.file}")
+        return
+
+    selected = runs if args.all else runs[-args.last:]
+    print("\n\n".join(format_run_summary(run) for run in selected))
 
 
 def main():
@@ -36,6 +89,17 @@ def main():
         "unfollow",
         help="Unfollow all users"
     )
+    unfollow_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last interrupted unfollow session"
+    )
+    unfollow_parser.add_argument(
+        "--reuse-chrome",
+        action=argparse.BooleanOptionalAction,
+        default=REUSE_CHROME,
+        help="Attach to a running Chrome instead of restarting it (default: REUSE_CHROME from config)"
+    )
     unfollow_parser.set_defaults(func=cmd_unfollow)
 
     follow_parser = subparsers.add_parser(
@@ -45,9 +109,49 @@ def main():
     follow_parser.add_argument(
         "count",
         type=int,
-        help="Number of users to follow"
+        nargs="?",
+        help="Number of users to follow (optional with --resume)"
+    )
+    follow_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the last interrupted follow session, skipping targets it already visited"
+    )
+    follow_parser.add_argument(
+        "--reuse-chrome",
+        action=argparse.BooleanOptionalAction,
+        default=REUSE_CHROME,
+        help="Attach to a running Chrome instead of restarting it (default: REUSE_CHROME from config)"
+    )
+    follow_parser.set_defaults(func=cmd_follow, parser=follow_parser)
+
+    stats_parser = subparsers.add_parser(
+        "stats",
+        help="Summarise where time went in recent runs"
+    )
+    stats_parser.add_argument(
+        "--last",
+        type=int,
+        default=1,
+        help="Number of most recent runs to show (default: 1)"
+    )
+    stats_parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Show every recorded run"
+    )
+    stats_parser.add_argument(
+        "--command",
+        dest="command_filter",
+        choices=["follow", "unfollow"],
+        help="Only show runs of this command"
+    )
+    stats_parser.add_argument(
+        "--file",
+        default="logs/metrics.jsonl",
+        help="Metrics file to read (default: logs/metrics.jsonl)"
     )
-    follow_parser.set_defaults(func=cmd_follow)
+    stats_parser.set_defaults(func=cmd_stats)
 
     args = parser.parse_args()
 
@@ -1,5 +1,7 @@
 # User-specific configuration
-# Copy this file to config_local.py and customize for your setup
+# Copy this file to config_local.py and customize for your setup; any setting
+# left out of config_local.py keeps the default below, and an upper-case name
+# that isn't one of these settings is reported as a warning
 # config_local.py is gitignored and won't be committed
 
 # Your Twitter username for the following page URL
@@ -10,6 +12,17 @@ TWITTER_USERNAME = "whatsaplat"
 SEARCH_BAR_X = 290
 SEARCH_BAR_Y = 81
 
+# Keep an already-running Chrome (and its logged-in tabs) instead of killing it
+# and starting a fresh one on every run
+REUSE_CHROME = False
+
+# DevTools backend: start Chrome with this remote-debugging port and navigate /
+# find buttons through the page itself, falling back to typing and image
+# recognition if it fails. None = off. Recent Chrome versions only open the port
+# for a non-default profile, so also set CHROME_PROFILE_DIR (e.g. "chrome-profile")
+CDP_PORT = None
+CHROME_PROFILE_DIR = None
+
 # Dead space coordinates (area to move mouse when not clicking)
 # Should be an empty area of the screen
 DEADSPACE_X = 20
@@ -30,3 +43,32 @@ SCROLL_PIXELS = 600  # How many pixels to scroll each time
 # Duplicate detection tolerance
 # Coordinates within this distance (pixels) are considered duplicates
 DUPLICATE_TOLERANCE = 50
+
+# Region of interest for follow/unfollow button matching: (left, top, width, height)
+# Set to None to learn the button column automatically from previous matches
+BUTTON_REGION = None
+
+# Learn button regions from past matches (only used when BUTTON_REGION is None)
+LEARN_BUTTON_REGION = True
+
+# Template matching mode
+# "exhaustive" = full-resolution search (slowest, most thorough)
+# "pyramid" = coarse search on a downscaled screenshot, refined at full resolution
+#             (reference images are only downscaled along sides of 32 px or more)
+# "fft" = same scores as exhaustive, one screenshot transform shared by all templates
+MATCH_MODE = "exhaustive"
+
+# Screen capture backend
+# "pyautogui" = default, works everywhere
+# "mss" = faster shared-memory capture (requires: pip install mss)
+# "replay" = play back recorded screenshots from REPLAY_SOURCE instead of the screen
+CAPTURE_BACKEND = "pyautogui"
+
+# Folder of screenshots or a video file, used when CAPTURE_BACKEND = "replay"
+REPLAY_SOURCE = "recordings"
+
+# Logging
+# Also write structured JSON-lines logs to logs/<this file> (None to disable)
+LOG_JSON_FILE = None
+# Per-module log levels, e.g. {"image_rec": "DEBUG", "csv_logger": "WARNING"}
+LOG_MODULE_LEVELS = {}
@@ -1,29 +1,55 @@
+# Defaults come from config.py; config_local.py overrides any of them. A
+# config_local.py written for an older version lacks the newer settings, so
+# each setting is looked up there first and falls back to config.py.
+import warnings
+
+import config
+
 try:
-    from config_local import (
-        CLICK_DELAY,
-        DEADSPACE_X,
-        DEADSPACE_Y,
-        DUPLICATE_TOLERANCE,
-        IMAGE_TOLERANCE,
-        SCROLL_DELAY,
-        SCROLL_PIXELS,
-        SEARCH_BAR_X,
-        SEARCH_BAR_Y,
-        TWITTER_USERNAME,
-    )
-except ImportError:
-    from config import (
-        CLICK_DELAY,
-        DEADSPACE_X,
-        DEADSPACE_Y,
-        DUPLICATE_TOLERANCE,
-        IMAGE_TOLERANCE,
-        SCROLL_DELAY,
-        SCROLL_PIXELS,
-        SEARCH_BAR_X,
-        SEARCH_BAR_Y,
-        TWITTER_USERNAME,
-    )
+    import config_local
+except ModuleNotFoundError as e:
+    if e.name != "config_local":
+        raise
+    config_local = None
+
+_SETTINGS: set[str] = set()
+
+
+def _setting(name: str):
+    _SETTINGS.add(name)
+    return getattr(config_local, name, getattr(config, name))
+
+
+TWITTER_USERNAME = _setting("TWITTER_USERNAME")
+SEARCH_BAR_X = _setting("SEARCH_BAR_X")
+SEARCH_BAR_Y = _setting("SEARCH_BAR_Y")
+REUSE_CHROME = _setting("REUSE_CHROME")
+CDP_PORT = _setting("CDP_PORT")
+CHROME_PROFILE_DIR = _setting("CHROME_PROFILE_DIR")
+DEADSPACE_X = _setting("DEADSPACE_X")
+DEADSPACE_Y = _setting("DEADSPACE_Y")
+IMAGE_TOLERANCE = _setting("IMAGE_TOLERANCE")
+SCROLL_DELAY = _setting("SCROLL_DELAY")
+CLICK_DELAY = _setting("CLICK_DELAY")
+SCROLL_PIXELS = _setting("SCROLL_PIXELS")
+DUPLICATE_TOLERANCE = _setting("DUPLICATE_TOLERANCE")
+BUTTON_REGION = _setting("BUTTON_REGION")
+LEARN_BUTTON_REGION = _setting("LEARN_BUTTON_REGION")
+MATCH_MODE = _setting("MATCH_MODE")
+CAPTURE_BACKEND = _setting("CAPTURE_BACKEND")
+REPLAY_SOURCE = _setting("REPLAY_SOURCE")
+LOG_JSON_FILE = _setting("LOG_JSON_FILE")
+LOG_MODULE_LEVELS = _setting("LOG_MODULE_LEVELS")
+
+# A misspelled setting would otherwise be ignored without a word
+if config_local is not None:
+    _unknown = sorted(name for name in vars(config_local) if name.isupper() and name not in _SETTINGS)
+    if _unknown:
+        warnings.warn(
+            f"config_local.py sets unknown setting(s) {', '.join(_unknown)}; "
+            "they are ignored (see config.py for the supported names)",
+            stacklevel=2,
+        )
 
 SEARCH_BAR_COORD = [SEARCH_BAR_X, SEARCH_BAR_Y]
 REFRESH_BUTTON_COORD = [118, 78]
@@ -33,4 +59,9 @@ SCROLL_PAUSE_TIME = SCROLL_DELAY
 DEADSPACE = [DEADSPACE_X, DEADSPACE_Y]
 DUPE_COORD_TOL = DUPLICATE_TOLERANCE
 UNFOLLOW_CLICK_TIMEOUT = CLICK_DELAY
-SCROLL_AMOUNT = SCROLL_PIXELS
\ No newline at end of file
+SCROLL_AMOUNT = SCROLL_PIXELS
+BUTTON_ROI = BUTTON_REGION
+LEARN_BUTTON_ROI = LEARN_BUTTON_REGION
+# How long to keep rechecking the confirm dialog's last position before searching the screen
+CONFIRM_DIALOG_TIMEOUT = 1.0
+CONFIRM_POLL_INTERVAL = 0.05
@@ -1,28 +1,168 @@
+import atexit
 import csv
+import gzip
+import shutil
+import signal
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Literal
 
+HEADERS = [
+    'timestamp',
+    'operation',
+    'success',
+    'target_profile',
+    'details',
+    'session_total'
+]
+
 
 class OperationLogger:
-    def __init__(self, csv_file: str = "twitter_operations.csv"):
+    """
+    Appends follow/unfollow results to a CSV file in logs/.
+
+    Nothing touches the disk until the first batch is flushed, so creating
+    one at import time costs nothing.
+
+    Rows are buffered and written in batches through a file handle that stays
+    open, instead of reopening the file for every row. The buffer is flushed
+    when it reaches batch_size rows, every flush_interval seconds from a
+    background thread, and on exit or SIGTERM.
+
+    Args:
+        csv_file: File name inside logs/
+        batch_size: Flush once this many rows are buffered
+        flush_interval: Flush at least this often (seconds); 0 disables the timer thread
+        max_bytes: Rotate the file once it grows past this size (0 disables)
+        rotate_daily: Also rotate when the date changes
+        compress: Gzip rotated files
+    """
+
+    def __init__(
+        self,
+        csv_file: str = "twitter_operations.csv",
+        batch_size: int = 50,
+        flush_interval: float = 5.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        rotate_daily: bool = False,
+        compress: bool = False,
+    ):
         self.log_dir = Path("logs")
-        self.log_dir.mkdir(exist_ok=True)
         self.csv_path = self.log_dir / csv_file
-        self._ensure_headers()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.compress = compress
+
+        self._buffer: list[list] = []
+        self._lock = threading.RLock()
+        self._file = None
+        self._writer = None
+        self._opened_on = None
+        self._stop = threading.Event()
+        self._flusher: threading.Thread | None = None
+        self._flushing_thread: threading.Thread | None = None
+        self._pending_signal = None
+
+        atexit.register(self.close)
+        self._install_signal_handler()
+
+    def _install_signal_handler(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        previous = signal.getsignal(signal.SIGTERM)
 
-    def _ensure_headers(self):
+        def handle_sigterm(signum, frame):
+            if self._flushing_thread is threading.current_thread():
+                # Interrupted our own flush mid-write: let it finish, it calls back here
+                self._pending_signal = (handle_sigterm, signum, frame)
+                return
+            self.close()
+            if callable(previous):
+                previous(signum, frame)
+            else:
+                raise SystemExit(128 + signum)
+
+        try:
+            signal.signal(signal.SIGTERM, handle_sigterm)
+        except ValueError:
+            pass
+
+    def _open(self):
+        self.log_dir.mkdir(exist_ok=True)
+        is_new = not self.csv_path.exists() or self.csv_path.stat().st_size == 0
+        self._file = open(self.csv_path, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._opened_on = datetime.now().date()
+        if is_new:
+            self._writer.writerow(HEADERS)
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def _should_rotate(self) -> bool:
+        if self.max_bytes and self.csv_path.exists() and self.csv_path.stat().st_size >= self.max_bytes:
+            return True
+        return self.rotate_daily and self._opened_on is not None and self._opened_on != datetime.now().date()
+
+    def _rotate(self):
+        self._close_file()
         if not self.csv_path.exists():
-            with open(self.csv_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'timestamp',
-                    'operation',
-                    'success',
-                    'target_profile',
-                    'details',
-                    'session_total'
-                ])
+            return
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        archive = self.csv_path.with_name(f"{self.csv_path.stem}.{stamp}{self.csv_path.suffix}")
+        # Two rotations within one second would otherwise overwrite the first archive
+        n = 1
+        while archive.exists() or archive.with_name(f"{archive.name}.gz").exists():
+            archive = self.csv_path.with_name(f"{self.csv_path.stem}.{stamp}-{n}{self.csv_path.suffix}")
+            n += 1
+        self.csv_path.rename(archive)
+        if self.compress:
+            with open(archive, 'rb') as src, gzip.open(f"{archive}.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+            archive.unlink()
+
+    def _start_flusher(self):
+        if self._flusher is not None or self.flush_interval <= 0:
+            return
+        self._flusher = threading.Thread(target=self._flush_periodically, name="csv-logger-flush", daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            # Taken out of the buffer before writing, so no later flush can write them again
+            rows, self._buffer = self._buffer, []
+            self._flushing_thread = threading.current_thread()
+            try:
+                if self._should_rotate():
+                    self._rotate()
+                if self._file is None:
+                    self._open()
+                self._writer.writerows(rows)
+                self._file.flush()
+            finally:
+                self._flushing_thread = None
+        if self._pending_signal is not None:
+            handler, signum, frame = self._pending_signal
+            self._pending_signal = None
+            handler(signum, frame)
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self.flush()
+            self._close_file()
 
     def log_operation(
         self,
@@ -34,9 +174,8 @@ class OperationLogger:
     ):
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-        with open(self.csv_path, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
+        with self._lock:
+            self._buffer.append([
                 timestamp,
                 operation,
                 success,
@@ -44,3 +183,6 @@ class OperationLogger:
                 details,
                 session_total
             ])
+            if len(self._buffer) >= self.batch_size:
+                self.flush()
+            self._start_flusher()
@@ -0,0 +1,245 @@
+import atexit
+import json
+import os
+import time
+from pathlib import Path
+
+from constants import BUTTON_ROI, DUPE_COORD_TOL, IMAGE_REC_TOLERANCE, LEARN_BUTTON_ROI, MATCH_MODE
+from frame import Frame
+from image_rec import (
+    Match,
+    MatchResult,
+    NEAR_SLACK,
+    Region,
+    RegionTracker,
+    Template,
+    TemplateLibrary,
+    find_first,
+    find_images,
+    find_near,
+)
+from metrics import span
+
+UNFOLLOW_BUTTON_IMAGES = "assets/unfollow_button_images"
+CONFIRM_UNFOLLOW_BUTTON_IMAGES = "assets/confirm_unfollow_button_images"
+FOLLOW_BUTTON_IMAGES = "assets/follow_button_images"
+LOCATION_CACHE = "cache/button_locations.json"
+TEMPLATE_STATS = "cache/template_hits.json"
+
+
+class LocationCache:
+    """
+    Last known screen position of buttons that don't move between clicks,
+    persisted so later batches and sessions can verify it instead of searching.
+
+    The file is read on first use and rewritten only when a position moves
+    further than slack pixels on either axis, i.e. out of the window find_near
+    searches around it; smaller moves are capture jitter and keep the old one.
+    """
+
+    def __init__(self, path: str = LOCATION_CACHE, slack: int = NEAR_SLACK):
+        self.path = Path(path)
+        self.slack = slack
+        self._locations: dict[str, tuple[int, int]] | None = None
+
+    def _load(self) -> dict[str, tuple[int, int]]:
+        if self._locations is None:
+            self._locations = {}
+            if self.path.exists():
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._locations = {name: tuple(coord) for name, coord in json.load(f).items()}
+                except (OSError, ValueError):
+                    pass
+        return self._locations
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._locations, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, name: str) -> tuple[int, int] | None:
+        return self._load().get(name)
+
+    def set(self, name: str, coord: tuple[int, int]) -> None:
+        locations = self._load()
+        known = locations.get(name)
+        if known is None or max(abs(coord[0] - known[0]), abs(coord[1] - known[1])) > self.slack:
+            locations[name] = coord
+            self._save()
+
+    def discard(self, name: str) -> None:
+        if self._load().pop(name, None) is not None:
+            self._save()
+
+
+class TemplateStats:
+    """
+    How often each template was tried and how often it hit, persisted across runs.
+
+    Used to try the likeliest template first when one match is enough. The
+    file is read on first use and rewritten at most every save_interval
+    seconds, plus once at exit.
+
+    Args:
+        path: JSON file to keep the counts in (None keeps them in memory only)
+        save_interval: Minimum seconds between writes
+    """
+
+    def __init__(self, path: str | None = TEMPLATE_STATS, save_interval: float = 30.0):
+        self.path = Path(path) if path else None
+        self.save_interval = save_interval
+        self._counts: dict[str, list[int]] | None = None
+        self._dirty = False
+        self._saved_at = 0.0
+        if self.path is not None:
+            atexit.register(self.save)
+
+    def _load(self) -> dict[str, list[int]]:
+        if self._counts is None:
+            self._counts = {}
+            if self.path is not None and self.path.exists():
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._counts = {key: list(counts) for key, counts in json.load(f).items()}
+                except (OSError, ValueError):
+                    pass
+        return self._counts
+
+    def hit_rate(self, template: Template) -> float:
+        # Laplace smoothing: templates with no history start at 0.5
+        tries, hits = self._load().get(template.path, (0, 0))
+        return (hits + 1) / (tries + 2)
+
+    def ordered(self, templates) -> list[Template]:
+        return sorted(templates, key=self.hit_rate, reverse=True)
+
+    def record(self, result: MatchResult) -> None:
+        counts = self._load()
+        for path, matches in result.per_template.items():
+            entry = counts.setdefault(path, [0, 0])
+            entry[0] += 1
+            entry[1] += bool(matches)
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        if not self._dirty or self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._counts, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+unfollow_templates = TemplateLibrary(UNFOLLOW_BUTTON_IMAGES)
+confirm_templates = TemplateLibrary(CONFIRM_UNFOLLOW_BUTTON_IMAGES)
+follow_templates = TemplateLibrary(FOLLOW_BUTTON_IMAGES)
+
+unfollow_region = RegionTracker(BUTTON_ROI, learn=LEARN_BUTTON_ROI)
+confirm_region = RegionTracker(learn=LEARN_BUTTON_ROI)
+follow_region = RegionTracker(BUTTON_ROI, learn=LEARN_BUTTON_ROI)
+
+button_locations = LocationCache()
+template_stats = TemplateStats()
+
+
+def detect_unfollow_buttons(
+    frame: Frame,
+    tolerance: float = IMAGE_REC_TOLERANCE,
+    mode: str = MATCH_MODE,
+    tracker: RegionTracker | None = unfollow_region,
+    region: Region | None = None,
+) -> MatchResult:
+    """Find unfollow buttons, returned top to bottom (then left to right) so they are clicked in page order."""
+    result = find_images(
+        frame,
+        unfollow_templates,
+        tolerance,
+        tracker=tracker,
+        mode=mode,
+        radius=DUPE_COORD_TOL,
+        region=region,
+    )
+    result.merged.sort(key=lambda match: (match.y, match.x))
+    return result
+
+
+def detect_confirm_button(
+    frame: Frame,
+    tolerance: float = IMAGE_REC_TOLERANCE,
+    mode: str = MATCH_MODE,
+    tracker: RegionTracker | None = confirm_region,
+    stats: TemplateStats | None = template_stats,
+) -> MatchResult:
+    """Find the confirm button, stopping at the first template that hits (all templates if stats is None)."""
+    if stats is None:
+        return find_images(frame, confirm_templates, tolerance, tracker=tracker, mode=mode)
+    result = find_first(frame, stats.ordered(confirm_templates), tolerance, tracker=tracker, mode=mode)
+    stats.record(result)
+    return result
+
+
+def locate_confirm_button(
+    frame: Frame,
+    tolerance: float = IMAGE_REC_TOLERANCE,
+    mode: str = MATCH_MODE,
+    cache: LocationCache | None = button_locations,
+    search: bool = True,
+) -> Match | None:
+    """
+    Find the confirm button, checking its cached position before searching the screen.
+
+    The dialog opens in the same place every time, so a template-sized match
+    at the cached position usually settles it. Only when that fails (the
+    window moved or resized) does this fall back to a full detection pass,
+    whose best hit becomes the new cached position.
+
+    Args:
+        search: Fall back to the full detection pass; with False only the
+            cached position is checked (None if there is none yet)
+    """
+    cached = cache.get("confirm") if cache is not None else None
+    if cached is not None:
+        with span("verify"):
+            match = find_near(frame, confirm_templates, tolerance, cached)
+        if match is not None:
+            cache.set("confirm", match.coord)
+            return match
+
+    if not search:
+        return None
+    result = detect_confirm_button(frame, tolerance, mode)
+    if not result.merged:
+        return None
+    if cache is not None:
+        cache.set("confirm", result.merged[0].coord)
+    return result.merged[0]
+
+
+def detect_follow_buttons(
+    frame: Frame,
+    tolerance: float = IMAGE_REC_TOLERANCE,
+    mode: str = MATCH_MODE,
+    tracker: RegionTracker | None = follow_region,
+    stats: TemplateStats | None = template_stats,
+) -> MatchResult:
+    """Find follow buttons with the first template that hits (all templates if stats is None)."""
+    if stats is None:
+        return find_images(frame, follow_templates, tolerance, tracker=tracker, mode=mode)
+    result = find_first(frame, stats.ordered(follow_templates), tolerance, tracker=tracker, mode=mode)
+    stats.record(result)
+    return result
+
+
+DETECTORS = {
+    "unfollow": detect_unfollow_buttons,
+    "confirm": detect_confirm_button,
+    "follow": detect_follow_buttons,
+}
@@ -1,50 +1,61 @@
-import os
 import random
 import time
 
 import pyautogui
 
-from chrome import launch_chrome
-from constants import DEADSPACE, IMAGE_REC_TOLERANCE, SCROLL_PAUSE_TIME, SEARCH_BAR_COORD
+import cdp
+from capture import capture_frame, wait_for_stable
+from checkpoint import CheckpointStore, Session
+from chrome import launch_chrome, wait_for_chrome
+from constants import DEADSPACE, SCROLL_PAUSE_TIME, SEARCH_BAR_COORD
 from csv_logger import OperationLogger
-from image_rec import find_image
+from detection import detect_follow_buttons, follow_region
+from frame import Frame
 from logger import setup_logger
+from metrics import metrics, span
+from profile_sampler import ProfileSampler
 from window import focus_chrome_window
 
 logger = setup_logger()
 csv_logger = OperationLogger()
+target_sampler = ProfileSampler("data/target_profiles.txt")
 
 
-def get_random_target() -> str:
-    fp = "data/target_profiles.txt"
-    with open(fp, "r") as f:
-        profiles = f.read().splitlines()
-    return random.choice(profiles)
+def get_random_target(session: Session | None = None) -> str:
+    """Pick a target profile, skipping ones this session already visited (e.g. before a resume)."""
+    target = target_sampler.sample(unique=True)
+    if session is None:
+        return target
+    for _ in range(len(target_sampler)):
+        if not session.is_processed(target):
+            break
+        target = target_sampler.sample(unique=True)
+    return target
 
 
 def convert_to_followers_url(random_target_url: str) -> str:
     return f"{random_target_url}/followers"
 
 
+@span("navigation")
 def get_to_followers_page(followers_page_url: str) -> None:
     focus_chrome_window()
-    pyautogui.click(SEARCH_BAR_COORD)
-    time.sleep(0.2)
-    pyautogui.press("delete")
-    time.sleep(0.2)
-    pyautogui.write(followers_page_url)
-    pyautogui.press("enter")
-    time.sleep(7)
-
-
-def find_random_follow_button() -> tuple[int, int] | None:
-    all_found_coords = []
-    reference_image_path = r"assets/follow_button_images"
-    for image in os.listdir(reference_image_path):
-        path = os.path.join(reference_image_path, image)
-        base_image = pyautogui.screenshot()
-        coords = find_image(base_image, path, tolerance=IMAGE_REC_TOLERANCE)
-        all_found_coords.extend(coords)
+    if not cdp.navigate(followers_page_url):
+        pyautogui.click(SEARCH_BAR_COORD)
+        time.sleep(0.2)
+        pyautogui.press("delete")
+        time.sleep(0.2)
+        pyautogui.write(followers_page_url)
+        pyautogui.press("enter")
+    wait_for_stable(tracker=follow_region, timeout=7, min_wait=1)
+
+
+def find_random_follow_button(frame: Frame | None = None) -> tuple[int, int] | None:
+    all_found_coords = cdp.locate("follow")
+    if not all_found_coords:
+        if frame is None:
+            frame = capture_frame()
+        all_found_coords = detect_follow_buttons(frame).coords
 
     logger.info(f"Found {len(all_found_coords)} coords for follow buttons")
     if len(all_found_coords) > 0:
@@ -55,28 +66,72 @@ def find_random_follow_button() -> tuple[int, int] | None:
     return None
 
 
+@span("scroll")
 def scroll_random() -> None:
     pyautogui.moveTo(*DEADSPACE, duration=0.1)
     random_scroll_amount = random.randint(500, 1000)
     pyautogui.scroll(-random_scroll_amount)
-    time.sleep(SCROLL_PAUSE_TIME)
-    time.sleep(1)
-
-
-def follow_random(count: int = 1) -> None:
-    logger.info(f"=== FOLLOW OPERATION STARTED === Target: {count} users")
-    follows = 0
-    while 1:
-        random_target = get_random_target()
+    wait_for_stable(tracker=follow_region, timeout=SCROLL_PAUSE_TIME + 1)
+
+
+def resumable_goal() -> int | None:
+    """Target count of the last unfinished follow session, or None if there is none to resume."""
+    store = CheckpointStore()
+    try:
+        session = store.latest_unfinished("follow")
+    finally:
+        store.close()
+    return session.goal if session is not None else None
+
+
+def follow_random(count: int | None = 1, resume: bool = False) -> None:
+    """
+    Follow count random users from the followers pages of target profiles.
+
+    Args:
+        count: Number of users to follow; when resuming, None keeps the
+            interrupted session's target
+        resume: Continue the last unfinished follow session, skipping the
+            target profiles it already visited
+    """
+    if count is None:
+        count = resumable_goal() if resume else None
+        if count is None:
+            raise ValueError("No unfinished follow session to resume; pass a count")
+    metrics.reset()
+    store = CheckpointStore()
+    session = store.resume_or_start("follow", resume, goal=count)
+    try:
+        run_follow(count, session)
+    except BaseException:
+        session.finish("interrupted")
+        raise
+    else:
+        session.finish()
+    finally:
+        store.close()
+        metrics.export("follow")
+
+
+def run_follow(count: int, session: Session) -> None:
+    follows = session.progress
+    if follows:
+        logger.info(f"=== FOLLOW OPERATION RESUMED === Session {session.id}, {follows}/{count} users followed so far")
+    else:
+        logger.info(f"=== FOLLOW OPERATION STARTED === Target: {count} users")
+    while follows < count:
+        random_target = get_random_target(session)
         logger.info(f"Random target selected: {random_target}")
         followers_page_url = convert_to_followers_url(random_target)
         logger.info(f"Navigating to followers page: {followers_page_url}")
         get_to_followers_page(followers_page_url)
         scroll_random()
 
-        random_follow_button = find_random_follow_button()
+        frame = capture_frame()
+        random_follow_button = find_random_follow_button(frame)
         if random_follow_button:
-            pyautogui.click(random_follow_button)
+            with span("click"):
+                pyautogui.click(random_follow_button)
             follows += 1
             logger.info(f"[FOLLOW] Successfully followed user from {random_target}. Total follows this session: {follows}/{count}")
             csv_logger.log_operation(
@@ -86,6 +141,7 @@ def follow_random(count: int = 1) -> None:
                 details=f"Followed user at coordinates {random_follow_button}",
                 session_total=follows
             )
+            session.record_attempt("follow", random_target, True, f"at {random_follow_button}")
         else:
             logger.warning(f"[FOLLOW] No follow button found on {random_target}")
             csv_logger.log_operation(
@@ -95,12 +151,14 @@ def follow_random(count: int = 1) -> None:
                 details="No follow button found on page",
                 session_total=follows
             )
+            session.record_attempt("follow", random_target, False, "No follow button found on page")
+        session.mark_processed(random_target)
+        session.save_progress(follows)
 
-        if follows >= count:
-            logger.info(f"=== FOLLOW OPERATION COMPLETED === Total followed: {count} users")
-            break
+    logger.info(f"=== FOLLOW OPERATION COMPLETED === Total followed: {follows} users")
 
 
 if __name__ == "__main__":
     launch_chrome(url="https://example.com", incognito=False)
+    wait_for_chrome()
     follow_random(count=3)
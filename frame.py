@@ -0,0 +1,126 @@
+import threading
+import time
+from functools import cached_property
+from typing import Any
+
+import cv2
+import numpy as np
+
+_TO_BGR = {
+    "RGB": cv2.COLOR_RGB2BGR,
+    "BGRA": cv2.COLOR_BGRA2BGR,
+}
+_TO_GRAY = {
+    "RGB": cv2.COLOR_RGB2GRAY,
+    "BGR": cv2.COLOR_BGR2GRAY,
+    "BGRA": cv2.COLOR_BGRA2GRAY,
+}
+
+
+class FrameBuffers:
+    """
+    Preallocated output arrays for a frame source's conversions, reused on
+    every grab instead of allocating full-screen arrays per frame.
+
+    Each thread gets its own set, so a frame stays valid until the next frame
+    from the same source is converted on the same thread.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, key: tuple, shape: tuple[int, ...]) -> np.ndarray:
+        buffers = self._local.__dict__.setdefault("buffers", {})
+        buffer = buffers.get(key)
+        if buffer is None or buffer.shape != shape:
+            buffer = buffers[key] = np.empty(shape, np.uint8)
+        return buffer
+
+
+class Frame:
+    """
+    A single screen capture shared by every detector in a detection pass.
+
+    Matching runs on ``color``: the pixels themselves for RGB and BGR frames
+    (templates are kept in both orders, see Template.image_for), and a
+    BGRA-to-BGR conversion otherwise. Converted views are computed on first
+    access and then reused, so matching several templates against one frame
+    converts it at most once; given buffers, conversions write into reused
+    arrays instead of allocating new ones.
+
+    Args:
+        pixels: Image array (or PIL image) as delivered by the capture backend
+        timestamp: Capture time, defaults to now
+        order: Channel order of pixels: "RGB", "BGR" or "BGRA"
+        left: Screen x coordinate of the frame's top-left pixel
+        top: Screen y coordinate of the frame's top-left pixel
+        buffers: Reusable conversion outputs owned by the capture source
+    """
+
+    def __init__(
+        self,
+        pixels: Any,
+        timestamp: float | None = None,
+        order: str = "RGB",
+        left: int = 0,
+        top: int = 0,
+        buffers: FrameBuffers | None = None,
+    ):
+        if order not in _TO_GRAY:
+            raise ValueError(f"Unsupported channel order {order!r}")
+        self.pixels = np.asarray(pixels)
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.order = order
+        self.left = left
+        self.top = top
+        self.buffers = buffers
+        self._scaled: dict[tuple[tuple[float, float], bool], np.ndarray] = {}
+
+    @property
+    def width(self) -> int:
+        return self.pixels.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.pixels.shape[0]
+
+    def _buffer(self, key: tuple, shape: tuple[int, ...]) -> np.ndarray | None:
+        return self.buffers.get(key, shape) if self.buffers is not None else None
+
+    @property
+    def color_order(self) -> str:
+        """Channel order of ``color``: "RGB" or "BGR"."""
+        return "RGB" if self.order == "RGB" else "BGR"
+
+    @cached_property
+    def color(self) -> np.ndarray:
+        """Three-channel pixels in color_order, without a copy unless the frame is BGRA."""
+        if self.order in ("RGB", "BGR"):
+            return self.pixels
+        dst = self._buffer(("color",), (self.height, self.width, 3))
+        return cv2.cvtColor(self.pixels, _TO_BGR[self.order], dst=dst)
+
+    @cached_property
+    def bgr(self) -> np.ndarray:
+        if self.color_order == "BGR":
+            return self.color
+        return cv2.cvtColor(self.pixels, _TO_BGR[self.order])
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        dst = self._buffer(("gray",), (self.height, self.width))
+        return cv2.cvtColor(self.pixels, _TO_GRAY[self.order], dst=dst)
+
+    def base(self, grayscale: bool = False) -> np.ndarray:
+        """The view templates are matched against."""
+        return self.gray if grayscale else self.color
+
+    def scaled(self, scale: tuple[float, float], grayscale: bool = False) -> np.ndarray:
+        """Color (or grayscale) view downscaled by scale (x, y), computed once per scale."""
+        key = (scale, grayscale)
+        if key not in self._scaled:
+            base = self.base(grayscale)
+            size = (int(round(base.shape[1] * scale[0])), int(round(base.shape[0] * scale[1])))
+            dst = self._buffer(("scaled", scale, grayscale), (size[1], size[0]) + base.shape[2:])
+            self._scaled[key] = cv2.resize(base, size, dst=dst, interpolation=cv2.INTER_AREA)
+        return self._scaled[key]
@@ -1,57 +1,753 @@
-from typing import Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, NamedTuple
 
 import cv2
 import numpy as np
 
+from frame import Frame
+from metrics import span
 
-def find_image(base_image: Any, reference_image_path: str, tolerance: float) -> list[tuple[int, int]]:
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+MATCH_MODES = ("exhaustive", "pyramid", "fft")
+
+# Pyramid matching: coarse pass at this scale, then full-resolution refinement.
+# Each axis is scaled separately and only if the template keeps at least
+# PYRAMID_MIN_SCALED_SIZE pixels along it, so a thin button crop is shrunk
+# along its width only (thin crops lose most of their structure when shrunk
+# across); a template too small along both axes is searched exhaustively. The
+# coarse threshold sits below the match threshold by the template's own
+# downscaling loss (Template.coarse_loss) plus this margin.
+PYRAMID_SCALE = 0.5
+PYRAMID_MIN_SCALED_SIZE = 16
+PYRAMID_SCORE_MARGIN = 0.1
+
+# find_near: how far (pixels) a match may have moved from its last known position
+NEAR_SLACK = 8
+
+# FFT matching: windows flatter than this (mean squared deviation per pixel and
+# channel) score 0, as in matchTemplate, instead of amplifying rounding noise
+FFT_MIN_WINDOW_VARIANCE = 0.01
+
+
+@dataclass
+class Template:
+    """
+    A decoded reference image, ready to be matched against screenshots.
+
+    image is BGR (or grayscale) as loaded; image_for returns it in the
+    channel order of the frame being searched, so RGB captures are matched
+    as they are instead of being converted every pass.
+    """
+
+    path: str
+    image: np.ndarray
+    mtime: float
+    grayscale: bool = False
+    _ordered: dict[str, np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+    _scaled: dict[tuple[tuple[float, float], str], np.ndarray] = field(default_factory=dict, repr=False, compare=False)
+    _coarse_loss: dict[tuple[float, float], float] = field(default_factory=dict, repr=False, compare=False)
+    _spectrum: tuple[tuple[tuple[int, int], str], tuple[list[np.ndarray], float]] | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    def image_for(self, order: str = "BGR") -> np.ndarray:
+        if self.grayscale or order == "BGR":
+            return self.image
+        if order not in self._ordered:
+            self._ordered[order] = cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+        return self._ordered[order]
+
+    def scaled(self, scale: tuple[float, float], order: str = "BGR") -> np.ndarray:
+        """The template resized by scale (x, y)."""
+        key = (scale, order)
+        if key not in self._scaled:
+            image = self.image_for(order)
+            self._scaled[key] = cv2.resize(image, None, fx=scale[0], fy=scale[1], interpolation=cv2.INTER_AREA)
+        return self._scaled[key]
+
+    def pyramid_scale(self) -> tuple[float, float] | None:
+        """
+        Per-axis (x, y) scale for the coarse pyramid pass: PYRAMID_SCALE along
+        every axis that keeps PYRAMID_MIN_SCALED_SIZE pixels, 1.0 along the
+        others; None if neither axis can be shrunk.
+        """
+        scale = tuple(
+            PYRAMID_SCALE if size * PYRAMID_SCALE >= PYRAMID_MIN_SCALED_SIZE else 1.0
+            for size in (self.width, self.height)
+        )
+        return None if scale == (1.0, 1.0) else scale
+
+    def coarse_loss(self, scale: tuple[float, float]) -> float:
+        """
+        How far below 1.0 an exact copy of the template scores at this scale,
+        for the worst alignment of the downscaling grid with the button.
+        """
+        if scale not in self._coarse_loss:
+            small = self.scaled(scale)
+            step_x, step_y = (max(1, int(round(1 / s))) for s in scale)
+            padded = cv2.copyMakeBorder(self.image, step_y, step_y, step_x, step_x, cv2.BORDER_REPLICATE)
+            worst = 1.0
+            for dy in range(step_y):
+                for dx in range(step_x):
+                    shifted = cv2.resize(
+                        padded[dy:, dx:], None, fx=scale[0], fy=scale[1], interpolation=cv2.INTER_AREA
+                    )
+                    score = cv2.matchTemplate(shifted, small, cv2.TM_CCOEFF_NORMED).max()
+                    worst = min(worst, float(score))
+            self._coarse_loss[scale] = 1.0 - worst
+        return self._coarse_loss[scale]
+
+    def spectrum(self, size: tuple[int, int], order: str = "BGR") -> tuple[list[np.ndarray], float]:
+        """
+        DFT of each zero-mean channel, zero-padded to size (rows, cols), and
+        the template's total squared deviation.
+
+        Only the most recent size and order is kept: at full-frame sizes one
+        spectrum is tens of MB, and region searches change the size from pass
+        to pass, so caching every size grows without bound.
+        """
+        key = (size, order)
+        cached = self._spectrum
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        planes = []
+        norm_sq = 0.0
+        for plane in cv2.split(self.image_for(order)):
+            plane = plane.astype(np.float32)
+            plane -= plane.mean()
+            norm_sq += float(np.square(plane, dtype=np.float64).sum())
+            padded = np.zeros(size, np.float32)
+            padded[:plane.shape[0], :plane.shape[1]] = plane
+            planes.append(cv2.dft(padded))
+        # One assignment, so match-pool threads sharing the template never see a half-updated entry
+        self._spectrum = (key, (planes, norm_sq))
+        return planes, norm_sq
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+
+class Match(NamedTuple):
+    """Centre of a template match in screen coordinates, with its score."""
+
+    x: int
+    y: int
+    score: float
+
+    @property
+    def coord(self) -> tuple[int, int]:
+        return (self.x, self.y)
+
+
+class Region(NamedTuple):
+    """Rectangle of the screen in pixels, as (left, top, width, height), in screen coordinates."""
+
+    left: int
+    top: int
+    width: int
+    height: int
+
+    def intersect(self, other: "Region") -> "Region":
+        left = max(self.left, other.left)
+        top = max(self.top, other.top)
+        right = max(left, min(self.left + self.width, other.left + other.width))
+        bottom = max(top, min(self.top + self.height, other.top + other.height))
+        return Region(left, top, right - left, bottom - top)
+
+    @classmethod
+    def of_frame(cls, frame: Frame) -> "Region":
+        return cls(frame.left, frame.top, frame.width, frame.height)
+
+
+class RegionTracker:
+    """
+    Remembers where a kind of button shows up so matching can skip the rest of the screen.
+
+    A region from config is used as-is. Otherwise the horizontal extent of
+    past hits is learned, since buttons sit in a fixed column of the page but
+    can appear at any height while scrolling.
+    """
+
+    def __init__(self, region: Region | None = None, learn: bool = True, padding: int = 40, min_hits: int = 3):
+        self.configured = Region(*region) if region else None
+        self.learn = learn
+        self.padding = padding
+        self.min_hits = min_hits
+        self.hits = 0
+        self._left: int | None = None
+        self._right: int | None = None
+
+    def region(self, frame: Frame) -> Region | None:
+        bounds = Region.of_frame(frame)
+        if self.configured is not None:
+            return self.configured.intersect(bounds)
+        if not self.learn or self.hits < self.min_hits or self._left is None:
+            return None
+        left = self._left - self.padding
+        right = self._right + self.padding
+        return Region(left, frame.top, right - left, frame.height).intersect(bounds)
+
+    def record(self, match: Match, template: Template) -> None:
+        left = match.x - template.width // 2
+        right = left + template.width
+        self._left = left if self._left is None else min(self._left, left)
+        self._right = right if self._right is None else max(self._right, right)
+        self.hits += 1
+
+
+class TemplateLibrary:
+    """
+    Loads every reference image in a folder once and keeps the decoded arrays.
+
+    Files are re-read only when their modification time changes, so new or
+    edited screenshots in the assets folder are still picked up without
+    restarting the bot.
+    """
+
+    def __init__(self, folder: str, grayscale: bool = False):
+        self.folder = folder
+        self.grayscale = grayscale
+        self._templates: dict[str, Template] = {}
+
+    def _load(self, path: str, mtime: float) -> Template | None:
+        flag = cv2.IMREAD_GRAYSCALE if self.grayscale else cv2.IMREAD_COLOR
+        image = cv2.imread(path, flag)
+        if image is None:
+            return None
+        return Template(path=path, image=image, mtime=mtime, grayscale=self.grayscale)
+
+    def refresh(self) -> None:
+        if not os.path.exists(self.folder):
+            self._templates.clear()
+            return
+
+        seen = set()
+        for image_file in sorted(os.listdir(self.folder)):
+            if not image_file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(self.folder, image_file)
+            mtime = os.path.getmtime(path)
+            seen.add(path)
+
+            cached = self._templates.get(path)
+            if cached is not None and cached.mtime == mtime:
+                continue
+
+            template = self._load(path, mtime)
+            if template is None:
+                self._templates.pop(path, None)
+            else:
+                self._templates[path] = template
+
+        for path in list(self._templates):
+            if path not in seen:
+                del self._templates[path]
+
+    @property
+    def templates(self) -> list[Template]:
+        self.refresh()
+        return list(self._templates.values())
+
+    def __iter__(self):
+        return iter(self.templates)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+
+def non_max_suppression(matches: list[Match], radius: float) -> list[Match]:
     """
-    Find all instances of a reference image within a base screenshot.
+    Keep the best-scoring match in every neighbourhood of the given radius.
+
+    Candidates are visited in descending score order and bucketed into a grid
+    of radius-sized cells, so each one is only compared against the handful of
+    kept matches in the surrounding cells instead of against every other match.
 
     Args:
-        base_image: PIL Image or numpy array of the screenshot
-        reference_image_path: Path to the reference image file
-        tolerance: Matching threshold (0.0 to 1.0, higher is stricter)
+        matches: Candidate matches, possibly from several templates
+        radius: Matches closer than this distance (pixels) are duplicates
 
     Returns:
-        List of (x, y) coordinates where matches are found
+        List of surviving matches, best score first
     """
-    base_array = np.array(base_image)
-    base_bgr = cv2.cvtColor(base_array, cv2.COLOR_RGB2BGR)
+    if not matches:
+        return []
+    if radius <= 0:
+        return sorted(matches, key=lambda m: m.score, reverse=True)
+
+    scores = np.fromiter((m.score for m in matches), dtype=np.float64, count=len(matches))
+    order = np.argsort(-scores, kind="stable")
+
+    radius_sq = radius * radius
+    cell = float(radius)
+    grid: dict[tuple[int, int], list[Match]] = {}
+    kept = []
+
+    for idx in order:
+        match = matches[idx]
+        cx, cy = int(match.x // cell), int(match.y // cell)
+
+        is_duplicate = False
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for existing in grid.get((gx, gy), ()):
+                    if (match.x - existing.x) ** 2 + (match.y - existing.y) ** 2 < radius_sq:
+                        is_duplicate = True
+                        break
+                if is_duplicate:
+                    break
+            if is_duplicate:
+                break
 
-    reference = cv2.imread(reference_image_path)
-    if reference is None:
+        if not is_duplicate:
+            grid.setdefault((cx, cy), []).append(match)
+            kept.append(match)
+
+    return kept
+
+
+def extract_peaks(score_map: np.ndarray, threshold: float, template_w: int, template_h: int) -> list[Match]:
+    """
+    Turn a matchTemplate score map into deduplicated match centres.
+
+    Only local maxima above the threshold are kept, which collapses the blob of
+    neighbouring pixels around each true match into a single candidate before
+    the final suppression step.
+
+    Args:
+        score_map: Result of cv2.matchTemplate with TM_CCOEFF_NORMED
+        threshold: Minimum score for a match
+        template_w: Width of the template that produced the score map
+        template_h: Height of the template that produced the score map
+
+    Returns:
+        List of matches centred on the template, best score first
+    """
+    above = score_map >= threshold
+    if not above.any():
         return []
 
-    result = cv2.matchTemplate(base_bgr, reference, cv2.TM_CCOEFF_NORMED)
+    kernel_w = max(1, template_w // 2) | 1
+    kernel_h = max(1, template_h // 2) | 1
+    local_max = cv2.dilate(score_map, np.ones((kernel_h, kernel_w), np.uint8))
+    peaks = above & (score_map >= local_max)
 
-    locations = np.where(result >= tolerance)
+    ys, xs = np.nonzero(peaks)
+    scores = score_map[ys, xs]
+    centers_x = xs + template_w // 2
+    centers_y = ys + template_h // 2
 
-    matches = []
-    ref_h, ref_w = reference.shape[:2]
+    candidates = [
+        Match(int(x), int(y), float(score))
+        for x, y, score in zip(centers_x, centers_y, scores)
+    ]
+    return non_max_suppression(candidates, min(template_w, template_h) * 0.5)
 
-    for pt in zip(*locations[::-1]):
-        center_x = pt[0] + ref_w // 2
-        center_y = pt[1] + ref_h // 2
-        matches.append((center_x, center_y))
 
-    if not matches:
+def _find_image_pyramid(frame: Frame, template: Template, tolerance: float, region: Region) -> list[Match]:
+    """
+    Coarse-to-fine search: match a downscaled frame, then verify each candidate
+    at full resolution in a window barely larger than the template.
+    """
+    scale = template.pyramid_scale()
+    if scale is None:
+        return _find_image_exhaustive(frame, template, tolerance, region)
+    scale_x, scale_y = scale
+    small_template = template.scaled(scale, frame.color_order)
+    small_h, small_w = small_template.shape[:2]
+
+    left, top, width, height = region
+    small_base = frame.scaled(scale, template.grayscale)
+    small_left, small_top = int((left - frame.left) * scale_x), int((top - frame.top) * scale_y)
+    small_base = small_base[small_top:small_top + int(height * scale_y), small_left:small_left + int(width * scale_x)]
+    if small_base.shape[0] < small_h or small_base.shape[1] < small_w:
+        return _find_image_exhaustive(frame, template, tolerance, region)
+
+    coarse = cv2.matchTemplate(small_base, small_template, cv2.TM_CCOEFF_NORMED)
+    coarse_threshold = tolerance - template.coarse_loss(scale) - PYRAMID_SCORE_MARGIN
+    candidates = extract_peaks(coarse, coarse_threshold, small_w, small_h)
+
+    base = frame.base(template.grayscale)
+    pad = int(np.ceil(1 / min(scale))) + 2
+    refined = []
+    for candidate in candidates:
+        x0 = int(round((candidate.x - small_w // 2 + small_left) / scale_x)) + frame.left - pad
+        y0 = int(round((candidate.y - small_h // 2 + small_top) / scale_y)) + frame.top - pad
+        x1 = min(x0 + template.width + 2 * pad, left + width)
+        y1 = min(y0 + template.height + 2 * pad, top + height)
+        x0, y0 = max(x0, left), max(y0, top)
+        window = Region(x0, y0, x1 - x0, y1 - y0)
+        refined.extend(_find_image_exhaustive(frame, template, tolerance, window, base))
+
+    return non_max_suppression(refined, min(template.width, template.height) * 0.5)
+
+
+def _find_image_exhaustive(
+    frame: Frame,
+    template: Template,
+    tolerance: float,
+    region: Region,
+    base: np.ndarray | None = None,
+) -> list[Match]:
+    if base is None:
+        base = frame.base(template.grayscale)
+
+    left, top, width, height = region
+    x0, y0 = left - frame.left, top - frame.top
+    base = base[y0:y0 + height, x0:x0 + width]
+    if base.shape[0] < template.height or base.shape[1] < template.width:
         return []
 
-    filtered_matches = []
-    matches.sort()
-
-    for match in matches:
-        if not filtered_matches:
-            filtered_matches.append(match)
-        else:
-            is_duplicate = False
-            for existing in filtered_matches:
-                distance = ((match[0] - existing[0])**2 + (match[1] - existing[1])**2)**0.5
-                if distance < min(ref_w, ref_h) * 0.5:
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                filtered_matches.append(match)
+    result = cv2.matchTemplate(base, template.image_for(frame.color_order), cv2.TM_CCOEFF_NORMED)
+
+    matches = extract_peaks(result, tolerance, template.width, template.height)
+    if left or top:
+        matches = [Match(m.x + left, m.y + top, m.score) for m in matches]
+    return matches
+
+
+class FrameSpectrum:
+    """
+    One DFT of a frame region, shared by every template matched against it.
+
+    matchTemplate redoes its correlation from scratch for every template. Here
+    the region is transformed once; each template then costs one spectrum
+    multiply and one inverse DFT, and the local means and variances that
+    TM_CCOEFF_NORMED divides by come from integral images built once per
+    region. The scores equal TM_CCOEFF_NORMED up to float32 rounding.
+    """
+
+    def __init__(self, frame: Frame, region: Region, grayscale: bool = False):
+        base = frame.base(grayscale)
+        left, top, width, height = region
+        x0, y0 = left - frame.left, top - frame.top
+        base = base[y0:y0 + height, x0:x0 + width]
+
+        self.region = region
+        self.order = frame.color_order
+        self.height, self.width = base.shape[:2]
+        self.size = (cv2.getOptimalDFTSize(self.height), cv2.getOptimalDFTSize(self.width))
+        self.spectra = []
+        planes = [base[..., c] for c in range(base.shape[2])] if base.ndim == 3 else [base]
+        for plane in planes:
+            padded = np.zeros(self.size, np.float32)
+            padded[:self.height, :self.width] = plane
+            self.spectra.append(cv2.dft(padded))
+
+        sums, sqsums = cv2.integral2(base, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+        self.sums = sums.reshape(self.height + 1, self.width + 1, -1)
+        self.sqsums = sqsums.reshape(self.height + 1, self.width + 1, -1).sum(axis=2)
+
+    def score_map(self, template: Template) -> np.ndarray | None:
+        """TM_CCOEFF_NORMED scores of template at every position in the region."""
+        h, w = template.height, template.width
+        if h > self.height or w > self.width:
+            return None
+
+        template_spectra, template_norm_sq = template.spectrum(self.size, self.order)
+        product = None
+        for frame_spectrum, template_spectrum in zip(self.spectra, template_spectra):
+            term = cv2.mulSpectrums(frame_spectrum, template_spectrum, 0, conjB=True)
+            product = term if product is None else product + term
+        correlation = cv2.idft(product, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT)
+        correlation = correlation[:self.height - h + 1, :self.width - w + 1].astype(np.float64)
+
+        def window_sum(integral: np.ndarray) -> np.ndarray:
+            return integral[h:, w:] - integral[:-h, w:] - integral[h:, :-w] + integral[:-h, :-w]
+
+        n = w * h
+        window_sums = window_sum(self.sums)
+        variance = window_sum(self.sqsums)
+        variance -= np.einsum("ijk,ijk->ij", window_sums, window_sums) / n
+
+        flat = variance <= FFT_MIN_WINDOW_VARIANCE * n * len(self.spectra)
+        variance[flat] = 1.0
+        np.sqrt(variance * template_norm_sq, out=variance)
+        scores = correlation / variance
+        scores[flat] = 0.0
+        return np.clip(scores, -1.0, 1.0).astype(np.float32)
+
+    def find(self, template: Template, tolerance: float) -> list[Match]:
+        scores = self.score_map(template)
+        if scores is None:
+            return []
+        matches = extract_peaks(scores, tolerance, template.width, template.height)
+        left, top = self.region.left, self.region.top
+        if left or top:
+            matches = [Match(m.x + left, m.y + top, m.score) for m in matches]
+        return matches
+
+
+def find_image(
+    frame: Frame,
+    template: Template,
+    tolerance: float,
+    region: Region | None = None,
+    mode: str = "exhaustive",
+) -> list[Match]:
+    """
+    Find all instances of a reference image within a captured frame.
+
+    Args:
+        frame: Screen capture shared by all templates in the detection pass
+        template: Preloaded reference image from a TemplateLibrary
+        tolerance: Matching threshold (0.0 to 1.0, higher is stricter)
+        region: Only search this part of the screen (None searches the whole frame)
+        mode: "exhaustive" matches at full resolution, "pyramid" runs a
+            downscaled pass first and only refines around its candidates,
+            "fft" correlates in the frequency domain (see FrameSpectrum)
+
+    Returns:
+        List of matches (centre screen coordinates and score), best score first
+    """
+    if mode not in MATCH_MODES:
+        raise ValueError(f"Unknown match mode {mode!r}, expected one of {MATCH_MODES}")
+
+    if region is None:
+        region = Region.of_frame(frame)
+
+    if mode == "pyramid":
+        return _find_image_pyramid(frame, template, tolerance, region)
+    if mode == "fft":
+        return FrameSpectrum(frame, region, template.grayscale).find(template, tolerance)
+    return _find_image_exhaustive(frame, template, tolerance, region)
+
+
+def find_near(
+    frame: Frame,
+    templates: Iterable[Template],
+    tolerance: float,
+    coord: tuple[int, int],
+    slack: int = NEAR_SLACK,
+) -> Match | None:
+    """
+    Check whether a template still matches at a previously seen location.
+
+    Only a window of template size plus slack pixels on each side, centred
+    on coord, is searched, so this costs a fraction of a full-frame match.
+
+    Args:
+        frame: Screen capture to check
+        templates: Reference images that may appear at coord
+        tolerance: Matching threshold (0.0 to 1.0, higher is stricter)
+        coord: Expected centre of the match in screen coordinates
+        slack: How far (in pixels) the match may have moved
+
+    Returns:
+        The best match inside the window, or None if nothing passes tolerance
+    """
+    bounds = Region.of_frame(frame)
+    best = None
+    for template in templates:
+        window = Region(
+            coord[0] - template.width // 2 - slack,
+            coord[1] - template.height // 2 - slack,
+            template.width + 2 * slack,
+            template.height + 2 * slack,
+        ).intersect(bounds)
+        for match in _find_image_exhaustive(frame, template, tolerance, window):
+            if best is None or match.score > best.score:
+                best = match
+    return best
+
+
+@dataclass
+class MatchResult:
+    """Outcome of matching a set of templates against one frame."""
+
+    per_template: dict[str, list[Match]]
+    merged: list[Match]
+
+    @property
+    def coords(self) -> list[tuple[int, int]]:
+        return [match.coord for match in self.merged]
+
+
+_match_pool: ThreadPoolExecutor | None = None
+
+
+def _get_match_pool() -> ThreadPoolExecutor:
+    global _match_pool
+    if _match_pool is None:
+        _match_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="image_rec")
+    return _match_pool
+
+
+def _prepare_frame(frame: Frame, templates: list[Template], mode: str) -> None:
+    # Build the shared colour/scaled views up front so worker threads only read them.
+    for grayscale in {template.grayscale for template in templates}:
+        frame.base(grayscale)
+    if mode == "pyramid":
+        for template in templates:
+            scale = template.pyramid_scale()
+            if scale is not None:
+                frame.scaled(scale, template.grayscale)
+
+
+def _match_all(
+    frame: Frame,
+    templates: list[Template],
+    tolerance: float,
+    region: Region | None,
+    mode: str,
+) -> dict[str, list[Match]]:
+    if mode == "fft":
+        return _match_all_fft(frame, templates, tolerance, region)
+    if len(templates) <= 1:
+        return {t.path: find_image(frame, t, tolerance, region, mode) for t in templates}
+
+    pool = _get_match_pool()
+    futures = {t.path: pool.submit(find_image, frame, t, tolerance, region, mode) for t in templates}
+    return {path: future.result() for path, future in futures.items()}
+
+
+def _match_all_fft(
+    frame: Frame,
+    templates: list[Template],
+    tolerance: float,
+    region: Region | None,
+) -> dict[str, list[Match]]:
+    if region is None:
+        region = Region.of_frame(frame)
+    spectra = {
+        grayscale: FrameSpectrum(frame, region, grayscale)
+        for grayscale in {template.grayscale for template in templates}
+    }
+    if len(templates) <= 1:
+        return {t.path: spectra[t.grayscale].find(t, tolerance) for t in templates}
+
+    pool = _get_match_pool()
+    futures = {t.path: pool.submit(spectra[t.grayscale].find, t, tolerance) for t in templates}
+    return {path: future.result() for path, future in futures.items()}
+
+
+def find_first(
+    frame: Frame,
+    templates: Iterable[Template],
+    tolerance: float,
+    tracker: RegionTracker | None = None,
+    mode: str = "exhaustive",
+    region: Region | None = None,
+) -> MatchResult:
+    """
+    Match templates one at a time, in the given order, and stop at the first that hits.
+
+    For buttons where any one match will do, putting the template that
+    usually hits first turns a pass over N templates into a single match.
+    The tracked region is tried first, as in find_images.
+
+    Args:
+        frame: Screen capture to search
+        templates: Reference images, most likely to match first
+        tolerance: Matching threshold (0.0 to 1.0, higher is stricter)
+        tracker: Region tracker for this kind of button, updated with the hit
+        mode: Matching mode passed through to find_image
+        region: Only search this part of the screen
+
+    Returns:
+        MatchResult whose per_template holds only the templates that were
+        evaluated; merged holds the winning template's matches (or nothing)
+    """
+    templates = list(templates)
+    tracked = tracker.region(frame) if tracker else None
+    if tracked is not None and region is not None:
+        tracked = tracked.intersect(region)
+
+    # Converted up front, as in find_images, so the conversion isn't counted as match time
+    with span("convert"):
+        _prepare_frame(frame, templates, mode)
+
+    per_template: dict[str, list[Match]] = {}
+    spectra: dict[tuple[Region, bool], FrameSpectrum] = {}
+    searches = [tracked, region] if tracked is not None else [region]
+    with span("match"):
+        for search_region in searches:
+            for template in templates:
+                if mode == "fft":
+                    # Transform each region once, however many templates it takes to hit
+                    key = (search_region or Region.of_frame(frame), template.grayscale)
+                    if key not in spectra:
+                        spectra[key] = FrameSpectrum(frame, *key)
+                    matches = spectra[key].find(template, tolerance)
+                else:
+                    matches = find_image(frame, template, tolerance, search_region, mode)
+                per_template[template.path] = per_template.get(template.path, []) + matches
+                if matches:
+                    if tracker is not None:
+                        for match in matches:
+                            tracker.record(match, template)
+                    return MatchResult(per_template=per_template, merged=matches)
+
+    return MatchResult(per_template=per_template, merged=[])
+
+
+def find_images(
+    frame: Frame,
+    templates: Iterable[Template],
+    tolerance: float,
+    tracker: RegionTracker | None = None,
+    mode: str = "exhaustive",
+    radius: float | None = None,
+    region: Region | None = None,
+) -> MatchResult:
+    """
+    Match a batch of templates against one frame on a shared thread pool.
+
+    cv2.matchTemplate releases the GIL, so templates are matched in parallel.
+    The tracked region is searched first; when it yields nothing the whole
+    frame (or the given region) is searched instead, so a stale or wrong
+    tracked region costs one extra pass rather than a missed button.
+
+    Args:
+        frame: Screen capture shared by all templates in the detection pass
+        templates: Reference images to look for
+        tolerance: Matching threshold (0.0 to 1.0, higher is stricter)
+        tracker: Region tracker for this kind of button, updated with the hits
+        mode: Matching mode passed through to find_image
+        radius: Merge distance across templates (defaults to half the smallest template side)
+        region: Only search this part of the screen
+
+    Returns:
+        MatchResult with the matches of each template (keyed by path) and the
+        merged, deduplicated set
+    """
+    templates = list(templates)
+    if not templates:
+        return MatchResult(per_template={}, merged=[])
+
+    with span("convert"):
+        _prepare_frame(frame, templates, mode)
+    tracked = tracker.region(frame) if tracker else None
+    if tracked is not None and region is not None:
+        tracked = tracked.intersect(region)
+
+    with span("match"):
+        per_template = _match_all(frame, templates, tolerance, tracked or region, mode)
+        if tracked is not None and not any(per_template.values()):
+            per_template = _match_all(frame, templates, tolerance, region, mode)
+
+    if tracker is not None:
+        for template in templates:
+            for match in per_template[template.path]:
+                tracker.record(match, template)
+
+    if radius is None:
+        radius = min(min(t.width, t.height) for t in templates) * 0.5
+    all_matches = [match for matches in per_template.values() for match in matches]
+
+    with span("nms"):
+        merged = non_max_suppression(all_matches, radius)
 
-    return filtered_matches
\ No newline at end of file
+    return MatchResult(per_template=per_template, merged=merged)
@@ -1,30 +1,166 @@
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
+from constants import LOG_JSON_FILE, LOG_MODULE_LEVELS
 
-def setup_logger(name: str = "twitter-unfollower", level: int = logging.INFO, log_file: str = "twitter_operations.log") -> logging.Logger:
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ModuleLevelFilter(logging.Filter):
+    """Drops records below the level configured for the module that emitted them."""
+
+    def __init__(self, default_level: int, module_levels: dict[str, int | str]):
+        super().__init__()
+        self.default_level = default_level
+        self.module_levels = {module: self._parse_level(module, lvl) for module, lvl in module_levels.items()}
+
+    @staticmethod
+    def _parse_level(module: str, lvl: int | str) -> int:
+        if isinstance(lvl, int):
+            return lvl
+        # getLevelName maps unknown names to "Level X" strings rather than failing
+        levelno = logging.getLevelName(str(lvl).upper())
+        if not isinstance(levelno, int):
+            raise ValueError(
+                f"Unknown log level {lvl!r} for module {module!r} in LOG_MODULE_LEVELS, "
+                "expected DEBUG, INFO, WARNING, ERROR or CRITICAL"
+            )
+        return levelno
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.module_levels.get(record.module, self.default_level)
+
+
+class _DeferredFileHandler(logging.FileHandler):
+    """Appends to a file inside logs/, creating both only when the first record arrives."""
+
+    def __init__(self, path: Path):
+        super().__init__(path, mode='a', encoding='utf-8', delay=True)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Puts records on the queue without formatting them, so the calling thread
+    only pays for a queue.put; the listener thread does the formatting and I/O.
+    The listener thread is started by the first record, not at setup.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, listener: QueueListener):
+        super().__init__(log_queue)
+        self.listener = listener
+        self._started = False
+        self._start_lock = threading.Lock()
+        # Registered now rather than on start, so the listener still outlives
+        # exit handlers registered after setup and can log what they report
+        atexit.register(self._stop_listener)
+
+    def _start_listener(self) -> None:
+        with self._start_lock:
+            if not self._started:
+                self.listener.start()
+                self._started = True
+
+    def _stop_listener(self) -> None:
+        with self._start_lock:
+            if self._started:
+                self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if not self._started:
+            self._start_listener()
+        super().enqueue(record)
+
+
+def setup_logger(
+    name: str = "twitter-unfollower",
+    level: int = logging.INFO,
+    log_file: str = "twitter_operations.log",
+    use_queue: bool = True,
+    json_file: str | None = LOG_JSON_FILE,
+    module_levels: dict[str, int | str] | None = None,
+) -> logging.Logger:
+    """
+    Configure the shared application logger (only the first call attaches handlers).
+
+    Cheap enough to call at import time: logs/, the log files and the
+    listener thread are only created once the first record is emitted.
+
+    Args:
+        name: Logger name
+        level: Default level for every module
+        log_file: Plain-text log file inside logs/
+        use_queue: Hand records to a background listener thread instead of
+            writing to the console and disk on the calling thread
+        json_file: Also write JSON-lines records to this file inside logs/
+        module_levels: Per-module overrides keyed by module name, e.g. {"image_rec": "DEBUG"}
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(level)
 
     if not logger.handlers:
+        if module_levels is None:
+            module_levels = LOG_MODULE_LEVELS
+        level_filter = ModuleLevelFilter(level, module_levels)
+        logger.setLevel(min([level, *level_filter.module_levels.values()]))
+
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S"
         )
 
+        log_dir = Path("logs")
+
         console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
 
-        log_dir = Path("logs")
-        log_dir.mkdir(exist_ok=True)
-        log_path = log_dir / log_file
-
-        file_handler = logging.FileHandler(log_path, mode='a', encoding='utf-8')
-        file_handler.setLevel(level)
+        file_handler = _DeferredFileHandler(log_dir / log_file)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+
+        handlers: list[logging.Handler] = [console_handler, file_handler]
+        if json_file:
+            json_handler = _DeferredFileHandler(log_dir / json_file)
+            json_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(json_handler)
+
+        if use_queue:
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            queue_handler = _DeferredQueueHandler(log_queue, QueueListener(log_queue, *handlers))
+            queue_handler.addFilter(level_filter)
+            logger.addHandler(queue_handler)
+        else:
+            for handler in handlers:
+                handler.addFilter(level_filter)
+                logger.addHandler(handler)
 
     return logger
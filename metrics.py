@@ -0,0 +1,192 @@
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator
+
+# Histogram bucket upper bounds in seconds, Prometheus style
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRICS_JSONL = "metrics.jsonl"
+METRICS_PROM = "metrics.prom"
+
+
+class Histogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def record(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "buckets": self.buckets,
+        }
+
+
+def quantile(buckets: list[int], q: float, maximum: float) -> float:
+    """Approximate a quantile from bucket counts by interpolating inside the bucket it falls in."""
+    total = sum(buckets)
+    if total == 0:
+        return 0.0
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            lower = BUCKETS[i - 1] if i > 0 else 0.0
+            upper = BUCKETS[i] if i < len(BUCKETS) else maximum
+            return min(lower + (upper - lower) * (rank - seen) / count, maximum)
+        seen += count
+    return maximum
+
+
+class Metrics:
+    """
+    Collects how long each phase of a run takes (capture, match, click, wait, ...).
+
+    Spans are cheap enough to leave on permanently: a perf_counter call on
+    entry and exit plus a histogram update under a lock.
+
+    Each span records its own (exclusive) time: a "wait" inside "navigation"
+    counts toward wait only, so the main thread's phases add up to at most
+    the run's wall time. Spans on other threads run alongside the main
+    thread and are recorded as "<thread name>/<phase>".
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.histograms: dict[str, Histogram] = {}
+        self.run_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self.histograms.get(phase)
+            if histogram is None:
+                histogram = self.histograms[phase] = Histogram()
+            histogram.record(seconds)
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        # One entry per open span on this thread: time spent in spans nested inside it
+        nested = getattr(self._local, "nested", None)
+        if nested is None:
+            nested = self._local.nested = []
+            thread = threading.current_thread()
+            self._local.prefix = "" if thread is threading.main_thread() else f"{thread.name}/"
+        nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            inner = nested.pop()
+            if nested:
+                nested[-1] += elapsed
+            self.record(self._local.prefix + phase, elapsed - inner)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.histograms.clear()
+            self.run_id = uuid.uuid4().hex[:12]
+            self.started = time.time()
+
+    def snapshot(self, command: str) -> dict:
+        with self._lock:
+            phases = {phase: h.to_dict() for phase, h in self.histograms.items()}
+        return {
+            "run_id": self.run_id,
+            "command": command,
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "duration": time.time() - self.started,
+            "bucket_bounds": list(BUCKETS),
+            "phases": phases,
+        }
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# HELP twitterbot_phase_seconds Time spent in each phase of a run",
+            "# TYPE twitterbot_phase_seconds histogram",
+        ]
+        with self._lock:
+            for phase, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'twitterbot_phase_seconds_bucket{{phase="{phase}",le="{bound}"}} {cumulative}')
+                lines.append(f'twitterbot_phase_seconds_bucket{{phase="{phase}",le="+Inf"}} {histogram.count}')
+                lines.append(f'twitterbot_phase_seconds_sum{{phase="{phase}"}} {histogram.total}')
+                lines.append(f'twitterbot_phase_seconds_count{{phase="{phase}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, command: str, log_dir: str = "logs") -> None:
+        """Append this run's histograms to metrics.jsonl and overwrite the Prometheus snapshot."""
+        directory = Path(log_dir)
+        directory.mkdir(exist_ok=True)
+        with open(directory / METRICS_JSONL, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.snapshot(command)) + "\n")
+        with open(directory / METRICS_PROM, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+
+
+metrics = Metrics()
+span = metrics.span
+
+
+def load_runs(path: str = f"logs/{METRICS_JSONL}") -> list[dict]:
+    runs = []
+    if not Path(path).exists():
+        return runs
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                runs.append(json.loads(line))
+    return runs
+
+
+def format_run_summary(run: dict) -> str:
+    """
+    Table of phase timings; shares are of the run's wall time. Phases from
+    background threads overlap the main thread's and are listed separately.
+    """
+    width = max([12, *(len(phase) for phase in run["phases"])])
+    header = f"{'phase':<{width}} {'count':>7} {'total s':>9} {'share':>6} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"
+    lines = [
+        f"Run {run['run_id']} ({run['command']}) started {run['started']}, {run['duration']:.1f}s wall time",
+        header,
+    ]
+    duration = run["duration"] or 1.0
+    phases = sorted(run["phases"].items(), key=lambda item: item[1]["sum"], reverse=True)
+    background = [(phase, h) for phase, h in phases if "/" in phase]
+    for group in ([item for item in phases if "/" not in item[0]], background):
+        if group is background and background:
+            lines.append("background threads (overlapping the phases above):")
+        for phase, h in group:
+            mean = h["sum"] / h["count"] if h["count"] else 0.0
+            lines.append(
+                f"{phase:<{width}} {h['count']:>7} {h['sum']:>9.2f} {h['sum'] / duration:>6.1%} {mean * 1000:>9.1f} "
+                f"{quantile(h['buckets'], 0.5, h['max']) * 1000:>8.0f} {quantile(h['buckets'], 0.95, h['max']) * 1000:>8.0f} "
+                f"{h['max'] * 1000:>8.0f}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+import mmap
+import os
+import random
+
+import numpy as np
+
+INDEX_MAGIC = b"TPIDX001"
+# magic, source size, source mtime (ns), line count
+INDEX_HEADER = np.dtype([("magic", "S8"), ("size", "<u8"), ("mtime_ns", "<u8"), ("count", "<u8")])
+SCAN_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+def _scan_line_offsets(mm: mmap.mmap, size: int) -> np.ndarray:
+    """Byte offsets of every non-empty line, scanning the file in fixed-size chunks."""
+    data = np.frombuffer(mm, dtype=np.uint8)
+    newlines = np.concatenate([
+        np.flatnonzero(data[start:start + SCAN_CHUNK_BYTES] == ord("\n")) + start
+        for start in range(0, size, SCAN_CHUNK_BYTES)
+    ])
+    starts = np.concatenate([[0], newlines + 1])
+    ends = np.concatenate([newlines, [size]])
+    # A line holding only the "\r" of a Windows line ending is empty too
+    lone_cr = (ends - starts == 1) & (data[np.minimum(starts, size - 1)] == ord("\r"))
+    offsets = starts[(ends > starts) & ~lone_cr].astype("<u8")
+    del data
+    return offsets
+
+
+class ProfileSampler:
+    """
+    Picks random lines from a (potentially huge) text file in O(1).
+
+    The byte offset of every non-empty line is stored in an index file next to
+    the source (``<file>.idx``) and memory-mapped, so neither the index nor the
+    profile list is ever read in full after the first build. The index is
+    rebuilt only when the source file's size or modification time changes.
+    The source is only opened to read a sampled line, so it can be edited
+    (or replaced, on Windows) while a run is going.
+
+    Args:
+        path: Text file with one entry per line
+        index_path: Where to keep the offset index (defaults to path + ".idx")
+    """
+
+    def __init__(self, path: str, index_path: str | None = None):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._stamp: tuple[int, int] | None = None
+        self._offsets: np.ndarray | None = None
+        self._used: set[int] = set()
+
+    def _source_stamp(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _load_index(self, stamp: tuple[int, int]) -> np.ndarray | None:
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < INDEX_HEADER.itemsize:
+            return None
+        header = np.fromfile(self.index_path, dtype=INDEX_HEADER, count=1)[0]
+        if header["magic"] != INDEX_MAGIC or (int(header["size"]), int(header["mtime_ns"])) != stamp:
+            return None
+        count = int(header["count"])
+        if count == 0:
+            return np.empty(0, dtype="<u8")
+        return np.memmap(self.index_path, dtype="<u8", mode="r", offset=INDEX_HEADER.itemsize, shape=(count,))
+
+    def _build_index(self, stamp: tuple[int, int]) -> np.ndarray:
+        size = stamp[0]
+        if size:
+            with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets = _scan_line_offsets(mm, size)
+        else:
+            offsets = np.empty(0, dtype="<u8")
+
+        header = np.array([(INDEX_MAGIC, stamp[0], stamp[1], len(offsets))], dtype=INDEX_HEADER)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            header.tofile(f)
+            offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+        return offsets
+
+    def refresh(self) -> None:
+        """Reload (or rebuild) the index if the source file changed since the last call."""
+        stamp = self._source_stamp()
+        if stamp == self._stamp:
+            return
+
+        # Release the old index mapping (the only reference to it) first:
+        # Windows can't replace a file that is still mapped
+        self._offsets = None
+        offsets = self._load_index(stamp)
+        if offsets is None:
+            offsets = self._build_index(stamp)
+        self._offsets = offsets
+        self._stamp = stamp
+        self._used.clear()
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._offsets)
+
+    def _line(self, i: int) -> str:
+        with open(self.path, "rb") as f:
+            f.seek(int(self._offsets[i]))
+            return f.readline().decode("utf-8").strip()
+
+    def sample(self, unique: bool = False) -> str:
+        """
+        Return a random line.
+
+        Args:
+            unique: Don't repeat a line within this session until every line
+                has been handed out once
+        """
+        self.refresh()
+        count = len(self._offsets)
+        if count == 0:
+            raise ValueError(f"No entries in {self.path}")
+
+        if not unique:
+            return self._line(random.randrange(count))
+
+        if len(self._used) >= count:
+            self._used.clear()
+        if len(self._used) > count // 2:
+            remaining = np.setdiff1d(np.arange(count), np.fromiter(self._used, dtype=np.int64, count=len(self._used)))
+            i = int(random.choice(remaining))
+        else:
+            i = random.randrange(count)
+            while i in self._used:
+                i = random.randrange(count)
+        self._used.add(i)
+        return self._line(i)
@@ -0,0 +1,123 @@
+import cv2
+import numpy as np
+
+from frame import Frame
+from image_rec import Region
+
+# Rows of overlap required before a scroll estimate is trusted
+MIN_OVERLAP_FRACTION = 0.25
+# Share of worst-matching rows ignored when comparing, e.g. a sticky header
+TRIM_FRACTION = 0.15
+# Mean absolute row-signature difference (0-255) above which the estimate is rejected
+MAX_SIGNATURE_ERROR = 4.0
+
+
+def row_signature(frame: Frame) -> np.ndarray:
+    """Mean intensity of every row of the frame, as a float32 vector."""
+    color = frame.color
+    rows = color.reshape(color.shape[0], -1)
+    return cv2.reduce(rows, 1, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel()
+
+
+def estimate_scroll_offset(previous: np.ndarray, current: np.ndarray, max_offset: int | None = None) -> int | None:
+    """
+    Estimate how far the page scrolled down between two frames.
+
+    Slides the row signature of the current frame over the previous one and
+    picks the shift with the smallest mean difference over the overlapping
+    rows. The worst-matching rows are left out of the mean, so content that
+    doesn't scroll, such as a sticky header, doesn't pull the estimate to zero;
+    ties between near-identical shifts are broken by the untrimmed mean.
+
+    Args:
+        previous: row_signature of the frame before scrolling
+        current: row_signature of the frame after scrolling
+        max_offset: Largest displacement (pixels) to consider
+
+    Returns:
+        Displacement in pixels (content moved up by this much), or None if the
+        frames don't line up well enough to tell
+    """
+    height = len(previous)
+    if len(current) != height or height == 0:
+        return None
+
+    min_overlap = max(1, int(height * MIN_OVERLAP_FRACTION))
+    if max_offset is None:
+        max_offset = height - min_overlap
+    max_offset = min(max_offset, height - min_overlap)
+
+    best_offset, best_error = None, (float("inf"), float("inf"))
+    for offset in range(0, max_offset + 1):
+        diff = np.abs(previous[offset:] - current[:height - offset])
+        keep = max(1, int(len(diff) * (1 - TRIM_FRACTION)))
+        trimmed = float(np.partition(diff, keep - 1)[:keep].mean())
+        error = (round(trimmed, 2), float(diff.mean()))
+        if error < best_error:
+            best_offset, best_error = offset, error
+
+    if best_error[0] > MAX_SIGNATURE_ERROR:
+        return None
+    return best_offset
+
+
+class PageTracker:
+    """
+    Tracks how far down the page we have scrolled and which buttons were already handled.
+
+    Handled buttons are stored in page coordinates (screen y plus the total
+    scroll so far), so a button that is still on screen after scrolling is
+    recognised and not clicked twice.
+    """
+
+    def __init__(self, radius: float, margin: int = 80):
+        self.radius = radius
+        self.margin = margin
+        self.page_offset = 0
+        self.handled: list[tuple[int, int]] = []
+        self._signature: np.ndarray | None = None
+
+    def observe(self, frame: Frame) -> int | None:
+        """
+        Update the scroll position from a new full-screen frame.
+
+        Returns:
+            Displacement since the previous frame, or None if it couldn't be
+            estimated (handled buttons are forgotten in that case)
+        """
+        signature = row_signature(frame)
+        offset = None
+        if self._signature is not None:
+            offset = estimate_scroll_offset(self._signature, signature)
+            if offset is None:
+                self.handled.clear()
+            else:
+                self.page_offset += offset
+                # Anything scrolled off the top of the screen can't be clicked again
+                self.handled = [(x, y) for x, y in self.handled if y >= self.page_offset - self.radius]
+        self._signature = signature
+        return offset
+
+    def revealed_region(self, frame: Frame, offset: int | None) -> Region | None:
+        """
+        Strip at the bottom of the frame that scrolled into view.
+
+        Returns None, meaning scan the whole frame, when the displacement is
+        unknown, zero (new content may have loaded in place) or too large to
+        save anything.
+        """
+        if offset is None or offset <= 0 or offset + self.margin >= frame.height:
+            return None
+        height = offset + self.margin
+        return Region(frame.left, frame.top + frame.height - height, frame.width, height)
+
+    def _to_page(self, coord: tuple[int, int]) -> tuple[int, int]:
+        return (coord[0], coord[1] + self.page_offset)
+
+    def is_handled(self, coord: tuple[int, int]) -> bool:
+        x, y = self._to_page(coord)
+        radius_sq = self.radius * self.radius
+        return any((x - hx) ** 2 + (y - hy) ** 2 < radius_sq for hx, hy in self.handled)
+
+    def mark_handled(self, coord: tuple[int, int]) -> None:
+        self.handled.append(self._to_page(coord))
@@ -0,0 +1,28 @@
+"""
+Headless simulation of the desktop the bot drives.
+
+Fake pyautogui and pygetwindow modules act on a simulated screen
+(sim.desktop) built from the real reference images in assets/, and a
+virtual clock (sim.clock) stands in for time.sleep, so unfollow_all.main
+and follow_random.follow_random run unmodified, without Chrome or a
+display, and much faster than real time. See `python -m sim --help`.
+"""
+
+import sys
+
+from sim import fake_pyautogui, fake_pygetwindow
+from sim.clock import VirtualClock
+from sim.desktop import Desktop
+
+
+def install(clock: VirtualClock, desktop: Desktop) -> None:
+    """
+    Route the bot's time, input and screen capture through the simulation.
+
+    Must run before unfollow_all, follow_random or window are imported, so
+    they bind the fake modules.
+    """
+    clock.install()
+    fake_pyautogui.desktop = desktop
+    sys.modules["pyautogui"] = fake_pyautogui
+    sys.modules["pygetwindow"] = fake_pygetwindow
@@ -0,0 +1,168 @@
+"""
+Run a command end to end against the simulated desktop and report throughput.
+
+The run happens in a scratch directory holding a link to assets/ and a
+generated data/target_profiles.txt, so the checkpoint database, caches
+and logs of the real setup are never touched. Results are in virtual
+time: operations per simulated hour, plus the real CPU time spent per
+operation, which is what detection changes move.
+
+Usage:
+    python -m sim unfollow --users 60
+    python -m sim follow --count 10 --dialog-delay 0.3
+    python -m sim unfollow --json --min-ops-per-hour 900
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+TARGET_PROFILES = 200
+
+
+def prepare_workdir(workdir: Path) -> None:
+    workdir.mkdir(parents=True, exist_ok=True)
+    assets = workdir / "assets"
+    if not assets.exists():
+        try:
+            assets.symlink_to(REPO_DIR / "assets", target_is_directory=True)
+        except OSError:
+            shutil.copytree(REPO_DIR / "assets", assets)
+    data = workdir / "data"
+    data.mkdir(exist_ok=True)
+    profiles = "".join(f"https://x.com/sim_target_{i}\n" for i in range(TARGET_PROFILES))
+    (data / "target_profiles.txt").write_text(profiles)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Run follow/unfollow against a simulated desktop")
+    parser.add_argument("command", choices=["unfollow", "follow"])
+    parser.add_argument("--users", type=int, default=60, help="Accounts on the simulated following page")
+    parser.add_argument("--count", type=int, default=10, help="Users to follow (follow only)")
+    parser.add_argument("--followers", type=int, default=40, help="Users on each simulated followers page")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for page contents and button images")
+    parser.add_argument("--page-load", type=float, default=1.5, help="Page load time (virtual seconds)")
+    parser.add_argument("--dialog-delay", type=float, default=0.08, help="Confirm dialog delay (virtual seconds)")
+    parser.add_argument("--pause", type=float, default=0.1, help="pyautogui.PAUSE after every input call")
+    parser.add_argument("--time-limit", type=float, default=3600, help="Stop after this many simulated seconds")
+    parser.add_argument("--workdir", type=Path, help="Keep the run's logs, caches and checkpoints here")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's INFO logs")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    parser.add_argument("--min-ops-per-hour", type=float, help="Fail if throughput drops below this")
+    parser.add_argument("--max-cpu-per-op", type=float, help="Fail if CPU seconds per operation exceed this")
+    args = parser.parse_args(argv)
+
+    if args.workdir is None:
+        workdir = Path(tempfile.mkdtemp(prefix="sim-"))
+        # Registered first so it runs last, after the loggers have flushed
+        atexit.register(shutil.rmtree, workdir, ignore_errors=True)
+    else:
+        workdir = args.workdir.resolve()
+    prepare_workdir(workdir)
+    sys.path.insert(0, str(REPO_DIR))
+    os.chdir(workdir)
+
+    import sim
+    from constants import BASE_UNFOLLOW_URL, SEARCH_BAR_COORD
+    from sim import fake_pyautogui
+    from sim.clock import SimulationTimeout, VirtualClock
+    from sim.desktop import Desktop, Timings
+
+    clock = VirtualClock(limit=args.time_limit)
+    desktop = Desktop(
+        clock,
+        BASE_UNFOLLOW_URL,
+        tuple(SEARCH_BAR_COORD),
+        following_count=args.users,
+        followers_count=args.followers,
+        timings=Timings(page_load=args.page_load, dialog_delay=args.dialog_delay),
+        seed=args.seed,
+    )
+    sim.install(clock, desktop)
+    fake_pyautogui.PAUSE = args.pause
+
+    import capture
+    import cdp
+    from metrics import format_run_summary, load_runs
+
+    # The simulated screen is only reachable through the fake pyautogui, and
+    # there is no DevTools endpoint, whatever config_local says
+    capture.set_frame_source(capture.PyAutoGuiSource())
+    cdp.get_client = lambda port=None: None
+    if not args.verbose:
+        logging.getLogger("twitter-unfollower").setLevel(logging.WARNING)
+
+    wall = sim.clock._real_monotonic
+    start_sim, start_cpu, start_wall = clock.monotonic(), time.process_time(), wall()
+    timed_out = False
+    try:
+        if args.command == "unfollow":
+            from unfollow_all import main as run_unfollow
+
+            run_unfollow()
+        else:
+            from follow_random import follow_random
+
+            follow_random(count=args.count)
+    except SimulationTimeout:
+        timed_out = True
+    sim_s = clock.monotonic() - start_sim
+    cpu_s = time.process_time() - start_cpu
+    wall_s = wall() - start_wall
+
+    ops = desktop.counts[args.command]
+    result = {
+        "command": args.command,
+        "ops": ops,
+        "sim_s": round(sim_s, 2),
+        "wall_s": round(wall_s, 2),
+        "cpu_s": round(cpu_s, 2),
+        "ops_per_sim_hour": round(ops / sim_s * 3600, 1) if sim_s else 0.0,
+        "cpu_s_per_op": round(cpu_s / ops, 3) if ops else None,
+        "speedup": round(sim_s / wall_s, 1) if wall_s else None,
+        "timed_out": timed_out,
+        **{key: value for key, value in desktop.counts.items() if key != args.command},
+    }
+    if args.command == "unfollow":
+        result["still_following"] = desktop.remaining_following
+
+    if args.json:
+        print(json.dumps(result))
+    else:
+        runs = load_runs("logs/metrics.jsonl")
+        if runs:
+            print(format_run_summary(runs[-1]))
+            print()
+        print(
+            f"{args.command}: {ops} ops in {sim_s:.0f}s simulated ({wall_s:.1f}s real, {result['speedup']}x), "
+            f"{result['ops_per_sim_hour']:.0f} ops per simulated hour"
+        )
+        if ops:
+            print(f"CPU: {cpu_s:.2f}s total, {result['cpu_s_per_op']:.3f}s per op")
+        print("Other events: " + ", ".join(
+            f"{key} {value}" for key, value in result.items()
+            if key in ("navigation", "missed_click", "wrong_follow", "follow", "unfollow", "still_following")
+        ))
+
+    failures = []
+    if timed_out:
+        failures.append(f"the run did not finish within {args.time_limit:.0f} simulated seconds")
+    if args.min_ops_per_hour is not None and result["ops_per_sim_hour"] < args.min_ops_per_hour:
+        failures.append(f"{result['ops_per_sim_hour']:.0f} ops per simulated hour, below {args.min_ops_per_hour:.0f}")
+    if args.max_cpu_per_op is not None and (result["cpu_s_per_op"] or 0) > args.max_cpu_per_op:
+        failures.append(f"{result['cpu_s_per_op']:.3f} CPU s per op, above {args.max_cpu_per_op}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
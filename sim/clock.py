@@ -0,0 +1,201 @@
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+# The real clock, captured before install() replaces the time functions
+_real_monotonic = time.monotonic
+_real_time = time.time
+
+
+class SimulationTimeout(Exception):
+    """The main thread slept past the clock's time limit."""
+
+
+class VirtualClock:
+    """
+    A clock that skips sleeps instead of waiting them out.
+
+    Virtual time runs at real speed while code is working (so detection and
+    rendering cost what they really cost) and jumps ahead whenever every
+    thread that uses the clock is asleep or waiting on an empty queue: the
+    earliest sleeper's wake-up time becomes "now" at once. Threads that
+    sleep while another one computes therefore overlap as they would in real
+    time, and a 60s back-off costs nothing.
+
+    Threads join the clock the first time they sleep or wait on a clock
+    queue. A thread that blocks on anything else (a lock, an Event) counts
+    as busy; if nothing changes for stall_timeout real seconds, the earliest
+    sleeper skips ahead anyway, so such a thread can't stop time forever.
+
+    Args:
+        start: Wall-clock time (epoch seconds) the simulation starts at
+        stall_timeout: Real seconds without any clock activity after which
+            sleepers skip ahead even though another thread seems busy
+        limit: Virtual seconds after which a sleep on the main thread raises
+            SimulationTimeout, ending a run that would never finish
+    """
+
+    def __init__(self, start: float | None = None, stall_timeout: float = 5.0, limit: float | None = None):
+        self.stall_timeout = stall_timeout
+        self.limit = limit
+        self._origin = _real_monotonic()
+        self._epoch = _real_time() if start is None else start
+        self._skipped = 0.0
+        self._cond = threading.Condition()
+        self._threads: dict[int, threading.Thread] = {}
+        self._wake: dict[int, float] = {}
+        self._queues: dict[int, "ClockQueue"] = {}
+        self._version = 0
+        self._installed: dict[str, Any] = {}
+
+    def monotonic(self) -> float:
+        return _real_monotonic() - self._origin + self._skipped
+
+    def time(self) -> float:
+        return self._epoch + self.monotonic()
+
+    @property
+    def skipped(self) -> float:
+        """Seconds of sleep skipped so far."""
+        return self._skipped
+
+    def sleep(self, seconds: float) -> None:
+        on_main_thread = threading.current_thread() is threading.main_thread()
+        if self.limit is not None and on_main_thread and self.monotonic() >= self.limit:
+            raise SimulationTimeout(f"Simulation passed its {self.limit:.0f}s time limit")
+        with self._cond:
+            self._wait(lambda: False, self.monotonic() + max(0.0, seconds))
+
+    def register(self, thread: threading.Thread | None = None) -> None:
+        """Count a thread as busy whenever it isn't sleeping, even before its first sleep."""
+        thread = thread or threading.current_thread()
+        with self._cond:
+            self._threads[thread.ident] = thread
+
+    def _changed(self) -> None:
+        self._version += 1
+        self._cond.notify_all()
+
+    def _is_idle(self, ident: int) -> bool:
+        if ident in self._wake:
+            return True
+        waiting_on = self._queues.get(ident)
+        return waiting_on is not None and not waiting_on._items
+
+    def _may_skip(self, ident: int, wake: float, stalled: bool) -> bool:
+        if min(self._wake.values()) < wake:
+            return False
+        if stalled:
+            return True
+        for other, thread in list(self._threads.items()):
+            if other == ident:
+                continue
+            if not thread.is_alive():
+                del self._threads[other]
+            elif not self._is_idle(other):
+                return False
+        return True
+
+    def _wait(self, ready: Callable[[], bool], wake: float | None, waiting_on: "ClockQueue | None" = None) -> bool:
+        """
+        Block the calling thread (holding the condition) until ready() or virtual time reaches wake.
+
+        Returns:
+            True if ready() became true, False if wake was reached first
+        """
+        ident = threading.get_ident()
+        self._threads[ident] = threading.current_thread()
+        if wake is not None:
+            self._wake[ident] = wake
+        if waiting_on is not None:
+            self._queues[ident] = waiting_on
+        self._changed()
+        try:
+            version, quiet_since = self._version, _real_monotonic()
+            while not ready():
+                now = self.monotonic()
+                if wake is not None:
+                    if now >= wake:
+                        return False
+                    stalled = _real_monotonic() - quiet_since >= self.stall_timeout
+                    if self._may_skip(ident, wake, stalled):
+                        self._skipped += wake - now
+                        return False
+                timeout = self.stall_timeout if wake is None else min(wake - now, self.stall_timeout)
+                self._cond.wait(timeout)
+                if self._version != version:
+                    version, quiet_since = self._version, _real_monotonic()
+            return True
+        finally:
+            self._wake.pop(ident, None)
+            self._queues.pop(ident, None)
+            self._changed()
+
+    def install(self) -> None:
+        """Route time.sleep/time/monotonic/perf_counter and queue.SimpleQueue through this clock."""
+        if self._installed:
+            return
+        clock = self
+        self._installed = {
+            "sleep": time.sleep,
+            "time": time.time,
+            "monotonic": time.monotonic,
+            "perf_counter": time.perf_counter,
+            "SimpleQueue": queue.SimpleQueue,
+        }
+        time.sleep = self.sleep
+        time.time = self.time
+        time.monotonic = self.monotonic
+        time.perf_counter = self.monotonic
+        queue.SimpleQueue = type("SimpleQueue", (ClockQueue,), {"__init__": lambda q: ClockQueue.__init__(q, clock)})
+        self.register()
+
+    def uninstall(self) -> None:
+        if not self._installed:
+            return
+        queue.SimpleQueue = self._installed.pop("SimpleQueue")
+        for name, function in self._installed.items():
+            setattr(time, name, function)
+        self._installed = {}
+
+
+class ClockQueue:
+    """
+    Drop-in for queue.SimpleQueue whose blocked getters count as idle.
+
+    A thread waiting on an empty queue lets the clock skip ahead; once
+    something is put, it counts as busy until it has taken the item, so
+    time never jumps past work that is about to start.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._items: deque = deque()
+
+    def put(self, item: Any, block: bool = True, timeout: float | None = None) -> None:
+        with self._clock._cond:
+            self._items.append(item)
+            self._clock._changed()
+
+    def put_nowait(self, item: Any) -> None:
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        with self._clock._cond:
+            if not self._items and block and timeout != 0:
+                wake = None if timeout is None else self._clock.monotonic() + timeout
+                self._clock._wait(lambda: bool(self._items), wake, waiting_on=self)
+            if not self._items:
+                raise queue.Empty
+            return self._items.popleft()
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def qsize(self) -> int:
+        return len(self._items)
@@ -0,0 +1,335 @@
+import bisect
+import random
+import threading
+import zlib
+from dataclasses import dataclass, field
+
+import cv2
+import numpy as np
+
+from image_rec import Region, Template, TemplateLibrary
+from sim.clock import VirtualClock
+
+ASSETS_DIR = "assets"
+SCREEN_SIZE = (1920, 1080)
+COLUMN_LEFT = 560
+COLUMN_WIDTH = 600
+BUTTON_MARGIN = 16
+ROW_PADDING = 16
+HEADER_HEIGHT = 53
+BIO_LINE_HEIGHT = 20
+# Dark theme, like the reference screenshots in assets/
+PAGE_BACKGROUND = (0, 0, 0)
+BROWSER_BACKGROUND = (40, 36, 35)
+TEXT_COLOR = (231, 233, 234)
+
+
+def _contains(region: Region, x: int, y: int) -> bool:
+    left, top, width, height = region
+    return left <= x < left + width and top <= y < top + height
+
+
+@dataclass
+class Timings:
+    """How long the simulated browser takes to react (virtual seconds)."""
+
+    page_load: float = 1.5
+    dialog_delay: float = 0.08
+    button_update: float = 0.1
+    scroll_animation: float = 0.25
+
+
+@dataclass
+class Row:
+    """One user cell: its look, and which button it shows since when."""
+
+    avatar: int
+    name_widths: tuple[int, int]
+    bio_widths: tuple[int, ...]
+    height: int
+    following: bool
+    changed_at: float = float("-inf")
+    previous: bool = False
+
+    def following_at(self, now: float) -> bool:
+        return self.following if now >= self.changed_at else self.previous
+
+    def set_following(self, following: bool, at: float) -> None:
+        self.previous = self.following_at(at)
+        self.following = following
+        self.changed_at = at
+
+
+@dataclass
+class Page:
+    url: str
+    rows: list[Row]
+    loaded_at: float
+    scroll_from: float = 0.0
+    scroll_to: float = 0.0
+    scroll_started: float = float("-inf")
+    canvas: np.ndarray | None = field(default=None, repr=False)
+    tops: list[int] = field(default_factory=list, repr=False)
+
+    def __post_init__(self):
+        top = HEADER_HEIGHT
+        for row in self.rows:
+            self.tops.append(top)
+            top += row.height
+        self.height = top + 200
+
+
+@dataclass
+class Dialog:
+    row: Row
+    shown_at: float
+    confirm: Region
+
+
+class Desktop:
+    """
+    A 1920x1080 screen showing one browser window with a Twitter-like page.
+
+    The following page (following_url) lists following_count users, each
+    with an unfollow ("Following") button; any URL ending in /followers
+    lists a random mix of followed and not-yet-followed users. Buttons are
+    the real reference images from assets/, so the bot's detectors see
+    what they would see on screen, and clicks on them follow, open the
+    unfollow confirmation dialog, or confirm it.
+
+    Every state change is stamped with the virtual clock and only becomes
+    visible after the matching Timings delay, so waits that are too short
+    show up as missed buttons just as they would against a real browser.
+
+    Args:
+        clock: Virtual clock for timestamps
+        following_url: URL of the account's following page
+        search_bar: Screen coordinate of the address bar
+        following_count: Users on the following page
+        followers_count: Users on each followers page
+        timings: Browser reaction times
+        seed: Seed for page contents and button looks
+    """
+
+    def __init__(
+        self,
+        clock: VirtualClock,
+        following_url: str,
+        search_bar: tuple[int, int],
+        following_count: int = 60,
+        followers_count: int = 40,
+        timings: Timings | None = None,
+        seed: int = 0,
+    ):
+        self.clock = clock
+        self.following_url = following_url
+        self.following_count = following_count
+        self.followers_count = followers_count
+        self.timings = timings or Timings()
+        self.seed = seed
+        self.width, self.height = SCREEN_SIZE
+
+        self.address_bar = Region(search_bar[0] - 250, search_bar[1] - 16, 900, 32)
+        self.viewport_top = max(110, search_bar[1] + 30)
+        self.viewport_height = self.height - self.viewport_top
+
+        rng = random.Random(seed)
+        self.unfollow_button = rng.choice(TemplateLibrary(f"{ASSETS_DIR}/unfollow_button_images").templates)
+        self.follow_button = rng.choice(TemplateLibrary(f"{ASSETS_DIR}/follow_button_images").templates)
+        self.confirm_button = rng.choice(TemplateLibrary(f"{ASSETS_DIR}/confirm_unfollow_button_images").templates)
+        self.row_height = max(72, self.unfollow_button.height + ROW_PADDING, self.follow_button.height + ROW_PADDING)
+
+        self.typed = ""
+        self.address_focused = False
+        self.mouse = (self.width // 2, self.height // 2)
+        self.page: Page | None = None
+        self.following_page: Page | None = None
+        self.dialog: Dialog | None = None
+        self.counts = {"follow": 0, "unfollow": 0, "wrong_follow": 0, "missed_click": 0, "navigation": 0}
+        self._lock = threading.RLock()
+
+    def _make_rows(self, url: str, count: int, following_share: float) -> list[Row]:
+        """Cells of varying height, like real profiles with bios of different lengths."""
+        rng = random.Random(zlib.crc32(url.encode()) ^ self.seed)
+        rows = []
+        for _ in range(count):
+            bio_widths = tuple(rng.randint(120, 440) for _ in range(rng.choice((0, 1, 1, 2, 3))))
+            rows.append(Row(
+                avatar=rng.randint(60, 220),
+                name_widths=(rng.randint(80, 260), rng.randint(60, 160)),
+                bio_widths=bio_widths,
+                height=self.row_height + BIO_LINE_HEIGHT * len(bio_widths),
+                following=rng.random() < following_share,
+            ))
+        return rows
+
+    def _build_canvas(self, page: Page) -> np.ndarray:
+        """Everything on the page except the buttons, which change and are drawn per frame."""
+        canvas = np.empty((page.height, COLUMN_WIDTH, 3), np.uint8)
+        canvas[:] = PAGE_BACKGROUND
+        for row, top in zip(page.rows, page.tops):
+            cv2.circle(canvas, (40, top + 32), 20, (row.avatar,) * 3, -1, cv2.LINE_AA)
+            cv2.rectangle(canvas, (76, top + 14), (76 + row.name_widths[0], top + 26), TEXT_COLOR, -1)
+            cv2.rectangle(canvas, (76, top + 34), (76 + row.name_widths[1], top + 44), (113, 118, 123), -1)
+            for i, width in enumerate(row.bio_widths):
+                y = top + self.row_height - 10 + i * BIO_LINE_HEIGHT
+                cv2.rectangle(canvas, (76, y), (76 + width, y + 10), TEXT_COLOR, -1)
+            bottom = top + row.height - 1
+            cv2.line(canvas, (0, bottom), (COLUMN_WIDTH - 1, bottom), (47, 51, 54))
+        return canvas
+
+    def navigate(self, url: str) -> None:
+        with self._lock:
+            now = self.clock.monotonic()
+            self.counts["navigation"] += 1
+            self.dialog = None
+            if url == self.following_url:
+                if self.following_page is None:
+                    rows = self._make_rows(url, self.following_count, 1.0)
+                    self.following_page = Page(url, rows, now)
+                    self.following_page.canvas = self._build_canvas(self.following_page)
+                page = self.following_page
+                page.loaded_at = now + self.timings.page_load
+                page.scroll_from = page.scroll_to = 0.0
+            else:
+                count = self.followers_count if url.rstrip("/").endswith("/followers") else 0
+                page = Page(url, self._make_rows(url, count, 0.3), now + self.timings.page_load)
+                page.canvas = self._build_canvas(page)
+            self.page = page
+
+    @property
+    def remaining_following(self) -> int:
+        """Users still followed on the following page."""
+        if self.following_page is None:
+            return self.following_count
+        return sum(row.following for row in self.following_page.rows)
+
+    def _scroll_offset(self, page: Page, now: float) -> float:
+        progress = (now - page.scroll_started) / self.timings.scroll_animation if self.timings.scroll_animation > 0 else 1
+        progress = min(1.0, max(0.0, progress))
+        return page.scroll_from + (page.scroll_to - page.scroll_from) * progress
+
+    def _visible_rows(self, page: Page, now: float):
+        """(row, top of the row on screen) for every row intersecting the viewport."""
+        offset = int(round(self._scroll_offset(page, now)))
+        first = max(0, bisect.bisect_right(page.tops, offset) - 1)
+        last = bisect.bisect_left(page.tops, offset + self.viewport_height)
+        for i in range(first, last):
+            yield page.rows[i], self.viewport_top + page.tops[i] - offset
+
+    def _button_rect(self, row: Row, row_top: int, now: float) -> tuple[Template, Region]:
+        template = self.unfollow_button if row.following_at(now) else self.follow_button
+        left = COLUMN_LEFT + COLUMN_WIDTH - BUTTON_MARGIN - template.width
+        top = row_top + (self.row_height - template.height) // 2
+        return template, Region(left, top, template.width, template.height)
+
+    def _dialog_layout(self) -> tuple[Region, Region]:
+        box = Region(self.width // 2 - 160, self.height // 2 - 130, 320, 260)
+        template = self.confirm_button
+        confirm = Region(box.left + (box.width - template.width) // 2, box.top + 150, template.width, template.height)
+        return box, confirm
+
+    def render(self) -> np.ndarray:
+        """The whole screen as a BGR array."""
+        with self._lock:
+            now = self.clock.monotonic()
+            screen = np.empty((self.height, self.width, 3), np.uint8)
+            screen[:self.viewport_top] = BROWSER_BACKGROUND
+            left, top, width, height = self.address_bar
+            cv2.rectangle(screen, (left, top), (left + width, top + height), (60, 56, 54), -1)
+            screen[self.viewport_top:] = PAGE_BACKGROUND
+
+            page = self.page
+            if page is None or now < page.loaded_at:
+                return screen
+
+            offset = int(round(self._scroll_offset(page, now)))
+            visible = page.canvas[offset:offset + self.viewport_height]
+            screen[self.viewport_top:self.viewport_top + len(visible), COLUMN_LEFT:COLUMN_LEFT + COLUMN_WIDTH] = visible
+            for row, row_top in self._visible_rows(page, now):
+                template, rect = self._button_rect(row, row_top, now)
+                self._paste(screen, template.image, rect)
+
+            if self.dialog is not None and now >= self.dialog.shown_at:
+                page_area = screen[self.viewport_top:]
+                page_area //= 3
+                box, confirm = self._dialog_layout()
+                cv2.rectangle(screen, (box.left, box.top), (box.left + box.width, box.top + box.height), PAGE_BACKGROUND, -1)
+                cv2.rectangle(screen, (box.left + 32, box.top + 32), (box.left + 220, box.top + 48), TEXT_COLOR, -1)
+                cv2.rectangle(screen, (box.left + 32, box.top + 64), (box.left + 280, box.top + 74), (113, 118, 123), -1)
+                self._paste(screen, self.confirm_button.image, confirm)
+                cv2.rectangle(
+                    screen, (box.left + 32, box.top + 200), (box.left + box.width - 32, box.top + 232), (83, 100, 113), 2
+                )
+            return screen
+
+    def _paste(self, screen: np.ndarray, image: np.ndarray, rect: Region) -> None:
+        """Copy image to rect, clipped to the page viewport."""
+        top = max(rect.top, self.viewport_top)
+        bottom = min(rect.top + rect.height, self.height)
+        if bottom <= top:
+            return
+        screen[top:bottom, rect.left:rect.left + rect.width] = image[top - rect.top:bottom - rect.top]
+
+    def move(self, x: int, y: int) -> None:
+        self.mouse = (int(x), int(y))
+
+    def click(self, x: int, y: int) -> None:
+        with self._lock:
+            self.move(x, y)
+            now = self.clock.monotonic()
+            self.address_focused = _contains(self.address_bar, x, y)
+            if self.address_focused:
+                return
+
+            if self.dialog is not None and now >= self.dialog.shown_at:
+                dialog, self.dialog = self.dialog, None
+                if _contains(dialog.confirm, x, y):
+                    dialog.row.set_following(False, now + self.timings.button_update)
+                    self.counts["unfollow"] += 1
+                return
+
+            page = self.page
+            if page is None or now < page.loaded_at or y < self.viewport_top:
+                self.counts["missed_click"] += 1
+                return
+            for row, row_top in self._visible_rows(page, now):
+                _, rect = self._button_rect(row, row_top, now)
+                if not _contains(rect, x, y) or rect.top < self.viewport_top:
+                    continue
+                if row.following_at(now):
+                    _, confirm = self._dialog_layout()
+                    self.dialog = Dialog(row, now + self.timings.dialog_delay, confirm)
+                else:
+                    row.set_following(True, now + self.timings.button_update)
+                    self.counts["wrong_follow" if page is self.following_page else "follow"] += 1
+                return
+            self.counts["missed_click"] += 1
+
+    def scroll(self, pixels: int) -> None:
+        """Scroll the page down by pixels (up if negative)."""
+        with self._lock:
+            page = self.page
+            now = self.clock.monotonic()
+            if page is None or now < page.loaded_at:
+                return
+            bottom = max(0, page.height - self.viewport_height)
+            page.scroll_from = self._scroll_offset(page, now)
+            page.scroll_to = min(bottom, max(0.0, page.scroll_to + pixels))
+            page.scroll_started = now
+
+    def key(self, name: str) -> None:
+        with self._lock:
+            if not self.address_focused:
+                return
+            if name in ("delete", "backspace"):
+                self.typed = ""
+            elif name == "enter":
+                self.address_focused = False
+                self.navigate(self.typed)
+
+    def type(self, text: str) -> None:
+        with self._lock:
+            if self.address_focused:
+                self.typed += text
+
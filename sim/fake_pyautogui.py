@@ -0,0 +1,96 @@
+"""
+Stand-in for the parts of pyautogui the bot uses, driving a sim.desktop.Desktop.
+
+Installed as sys.modules["pyautogui"] by sim.install(). Like the real
+module, every call is followed by a PAUSE-second sleep, and moveTo with a
+duration takes that long; both sleeps go through the virtual clock.
+"""
+
+import time
+from typing import Any
+
+import cv2
+
+PAUSE = 0.1
+MINIMUM_DURATION = 0.1
+FAILSAFE = False
+
+desktop: Any = None
+
+
+def _pause() -> None:
+    if PAUSE:
+        time.sleep(PAUSE)
+
+
+def _point(x: Any, y: Any) -> tuple[int, int]:
+    if x is None:
+        return desktop.mouse
+    if y is None:
+        x, y = x
+    return int(x), int(y)
+
+
+def size() -> tuple[int, int]:
+    return desktop.width, desktop.height
+
+
+def position() -> tuple[int, int]:
+    return desktop.mouse
+
+
+def moveTo(x: Any = None, y: Any = None, duration: float = 0.0, *args, **kwargs) -> None:
+    if duration >= MINIMUM_DURATION:
+        time.sleep(duration)
+    desktop.move(*_point(x, y))
+    _pause()
+
+
+def click(x: Any = None, y: Any = None, clicks: int = 1, interval: float = 0.0, *args, **kwargs) -> None:
+    point = _point(x, y)
+    for i in range(clicks):
+        if i and interval:
+            time.sleep(interval)
+        desktop.click(*point)
+    _pause()
+
+
+def scroll(clicks: int, x: Any = None, y: Any = None, **kwargs) -> None:
+    # Positive scrolls up, as in pyautogui; one click is taken as one pixel
+    if x is not None:
+        desktop.move(*_point(x, y))
+    desktop.scroll(-int(clicks))
+    _pause()
+
+
+def press(keys: str | list[str], presses: int = 1, interval: float = 0.0, **kwargs) -> None:
+    for key in [keys] if isinstance(keys, str) else keys:
+        for _ in range(presses):
+            desktop.key(key.lower())
+            if interval:
+                time.sleep(interval)
+    _pause()
+
+
+def write(message: str, interval: float = 0.0, **kwargs) -> None:
+    for char in message:
+        desktop.type(char)
+        if interval:
+            time.sleep(interval)
+    _pause()
+
+
+typewrite = write
+
+
+def screenshot(imageFilename: str | None = None, region: tuple[int, int, int, int] | None = None):
+    from PIL import Image
+
+    pixels = desktop.render()
+    if region is not None:
+        left, top, width, height = region
+        pixels = pixels[top:top + height, left:left + width]
+    image = Image.fromarray(cv2.cvtColor(pixels, cv2.COLOR_BGR2RGB))
+    if imageFilename:
+        image.save(imageFilename)
+    return image
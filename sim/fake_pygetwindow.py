@@ -0,0 +1,21 @@
+"""Stand-in for pygetwindow: one browser window, always there."""
+
+
+class Window:
+    def __init__(self, title: str):
+        self.title = title
+        self.isActive = False
+
+    def activate(self) -> None:
+        self.isActive = True
+
+
+_window = Window("Home / X - Google Chrome")
+
+
+def getAllWindows() -> list[Window]:
+    return [_window]
+
+
+def getWindowsWithTitle(title: str) -> list[Window]:
+    return [window for window in getAllWindows() if title.lower() in window.title.lower()]
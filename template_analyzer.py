@@ -0,0 +1,234 @@
+"""
+Finds redundant reference images in a template folder.
+
+Every template is matched on every detection pass, so each near-duplicate
+screenshot in assets/ costs a full matchTemplate per frame. This tool
+
+- scores every pair of templates against each other and groups near-duplicates,
+- replays an annotated screenshot corpus (same layout as bench.detect) to see
+  which ground-truth buttons each template finds and which only it finds,
+- proposes the smallest set of templates that still finds every button the
+  full set finds (greedy set cover), and with --apply moves the rest into a
+  pruned/ subfolder, where the TemplateLibrary no longer loads them.
+
+Usage:
+    python template_analyzer.py unfollow
+    python template_analyzer.py unfollow --corpus path/to/corpus --tolerance 0.8
+    python template_analyzer.py unfollow --corpus path/to/corpus --apply
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from bench.detect import load_corpus
+from constants import IMAGE_REC_TOLERANCE
+from detection import confirm_templates, follow_templates, unfollow_templates
+from frame import Frame
+from image_rec import Template, TemplateLibrary, find_image
+
+LIBRARIES = {
+    "unfollow": unfollow_templates,
+    "confirm": confirm_templates,
+    "follow": follow_templates,
+}
+PRUNED_DIR = "pruned"
+
+
+def similarity(a: Template, b: Template) -> float:
+    """
+    Best TM_CCOEFF_NORMED score of one template inside the other.
+
+    The smaller image is slid over the larger; when neither fits inside the
+    other, b is resized to a's shape and compared in place. A tight crop of
+    a button therefore scores ~1.0 against a looser crop of the same button:
+    wherever the looser one matches, the tight one does too.
+    """
+    if a.height <= b.height and a.width <= b.width:
+        return float(cv2.matchTemplate(b.image, a.image, cv2.TM_CCOEFF_NORMED).max())
+    if b.height <= a.height and b.width <= a.width:
+        return float(cv2.matchTemplate(a.image, b.image, cv2.TM_CCOEFF_NORMED).max())
+    resized = cv2.resize(b.image, (a.width, a.height), interpolation=cv2.INTER_AREA)
+    return float(cv2.matchTemplate(a.image, resized, cv2.TM_CCOEFF_NORMED).max())
+
+
+def similarity_matrix(templates: list[Template]) -> np.ndarray:
+    n = len(templates)
+    matrix = np.eye(n)
+    for i in range(n):
+        for j in range(i + 1, n):
+            matrix[i, j] = matrix[j, i] = similarity(templates[i], templates[j])
+    return matrix
+
+
+def cluster(matrix: np.ndarray, threshold: float) -> list[list[int]]:
+    """Group templates connected by a similarity of at least threshold (single linkage)."""
+    parent = list(range(len(matrix)))
+
+    def root(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in zip(*np.nonzero(np.triu(matrix, 1) >= threshold)):
+        parent[root(i)] = root(j)
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(matrix)):
+        groups.setdefault(root(i), []).append(i)
+    return sorted(groups.values(), key=len, reverse=True)
+
+
+def replay_corpus(
+    corpus, detector: str, templates: list[Template], tolerance: float, mode: str, radius: float
+) -> tuple[dict[str, set[tuple[int, int]]], dict[str, int], int]:
+    """
+    Match every template on every annotated frame.
+
+    Returns:
+        (hits, false_positives, total) where hits maps each template path to
+        the ground-truth buttons it found, as (frame index, button index)
+        pairs, and total is the number of annotated buttons
+    """
+    hits: dict[str, set[tuple[int, int]]] = {t.path: set() for t in templates}
+    false_positives = {t.path: 0 for t in templates}
+    total = 0
+    radius_sq = radius * radius
+
+    for frame_index, (_, pixels, truth) in enumerate(corpus):
+        if detector not in truth:
+            continue
+        expected = truth[detector]
+        total += len(expected)
+        frame = Frame(pixels, order="BGR")
+        for template in templates:
+            for match in find_image(frame, template, tolerance, mode=mode):
+                near = [
+                    i for i, (ex, ey) in enumerate(expected)
+                    if (match.x - ex) ** 2 + (match.y - ey) ** 2 <= radius_sq
+                ]
+                if near:
+                    hits[template.path].update((frame_index, i) for i in near)
+                else:
+                    false_positives[template.path] += 1
+
+    return hits, false_positives, total
+
+
+def greedy_cover(hits: dict[str, set[tuple[int, int]]], false_positives: dict[str, int]) -> list[str]:
+    """
+    Smallest-ish set of templates that finds every button any template finds.
+
+    Repeatedly takes the template covering the most still-uncovered buttons,
+    preferring fewer false positives on ties. Greedy set cover is within a
+    log factor of optimal, which is plenty for a dozen templates.
+    """
+    uncovered = set().union(*hits.values()) if hits else set()
+    chosen = []
+    while uncovered:
+        best = max(hits, key=lambda path: (len(hits[path] & uncovered), -false_positives[path]))
+        gained = hits[best] & uncovered
+        if not gained:
+            break
+        chosen.append(best)
+        uncovered -= gained
+    return chosen
+
+
+def apply_pruning(library: TemplateLibrary, keep: list[str]) -> list[Path]:
+    """Move every template not in keep into the folder's pruned/ subfolder."""
+    if not keep:
+        raise ValueError(f"Refusing to prune every template in {library.folder}")
+    pruned_dir = Path(library.folder) / PRUNED_DIR
+    moved = []
+    for template in library.templates:
+        if template.path in keep:
+            continue
+        pruned_dir.mkdir(exist_ok=True)
+        target = pruned_dir / Path(template.path).name
+        shutil.move(template.path, target)
+        moved.append(target)
+    return moved
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Find redundant reference images in a template folder")
+    parser.add_argument("detector", choices=list(LIBRARIES), help="Which template folder to analyse")
+    parser.add_argument("--corpus", type=Path, help="Annotated screenshot folder (see bench.detect) to measure coverage")
+    parser.add_argument("--tolerance", type=float, default=IMAGE_REC_TOLERANCE, help="Match threshold for the replay")
+    parser.add_argument("--mode", default="exhaustive", help="Matching mode for the replay")
+    parser.add_argument("--radius", type=float, default=15, help="Max distance (px) for a hit to count as correct")
+    parser.add_argument("--similarity", type=float, default=0.9, help="Score at which two templates count as duplicates")
+    parser.add_argument("--apply", action="store_true", help="Move templates outside the covering set into pruned/")
+    args = parser.parse_args(argv)
+
+    library = LIBRARIES[args.detector]
+    templates = library.templates
+    if not templates:
+        print(f"No templates in {library.folder}", file=sys.stderr)
+        return 1
+    names = [t.name for t in templates]
+    width = max(len(name) for name in names)
+
+    matrix = similarity_matrix(templates)
+    print(f"{len(templates)} templates in {library.folder}\n")
+    print("Most similar pairs:")
+    pairs = sorted(
+        ((matrix[i, j], i, j) for i in range(len(templates)) for j in range(i + 1, len(templates))),
+        reverse=True,
+    )
+    for score, i, j in pairs[:10]:
+        print(f"  {score:.3f}  {names[i]:<{width}}  {names[j]}")
+
+    groups = [group for group in cluster(matrix, args.similarity) if len(group) > 1]
+    print(f"\nNear-duplicate groups (similarity >= {args.similarity}):")
+    for group in groups:
+        print("  " + ", ".join(names[i] for i in group))
+    if not groups:
+        print("  none")
+
+    if args.corpus is None:
+        print("\nPass --corpus to measure which templates are needed.")
+        return 0
+
+    corpus = load_corpus(args.corpus)
+    hits, false_positives, total = replay_corpus(
+        corpus, args.detector, templates, args.tolerance, args.mode, args.radius
+    )
+    if total == 0:
+        print(f"\nNo '{args.detector}' annotations in {args.corpus}", file=sys.stderr)
+        return 1
+
+    print(f"\nCorpus replay: {total} annotated buttons, tolerance {args.tolerance}, mode {args.mode}")
+    print(f"  {'template':<{width}} {'hits':>5} {'unique':>6} {'false+':>6}")
+    for template in templates:
+        others = set().union(*(h for path, h in hits.items() if path != template.path))
+        unique = len(hits[template.path] - others)
+        print(f"  {template.name:<{width}} {len(hits[template.path]):>5} {unique:>6} {false_positives[template.path]:>6}")
+
+    covered = set().union(*hits.values())
+    keep = greedy_cover(hits, false_positives)
+    print(f"\nAll templates find {len(covered)}/{total} buttons; {len(keep)} of them find the same ones:")
+    for path in keep:
+        print(f"  {Path(path).name}")
+
+    if not keep:
+        # Nothing matched: the tolerance is too strict or the annotations are off,
+        # and pruning would leave detection without a single template
+        print(f"\nNo template found any annotated button; not pruning {library.folder}", file=sys.stderr)
+        return 1
+    if args.apply:
+        moved = apply_pruning(library, keep)
+        print(f"\nMoved {len(moved)} templates to {Path(library.folder) / PRUNED_DIR}")
+    else:
+        print(f"\nRe-run with --apply to move the other {len(templates) - len(keep)} templates to {PRUNED_DIR}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,137 +1,147 @@
-import os
+import queue
+import threading
 import time
+from typing import Callable, NamedTuple
 
 import pyautogui
 
-from chrome import launch_chrome
+import cdp
+from capture import capture_frame, wait_for_stable
+from checkpoint import CheckpointStore, Session
+from chrome import launch_chrome, wait_for_chrome
 from csv_logger import OperationLogger
 from logger import setup_logger
 from constants import (
     BASE_UNFOLLOW_URL,
+    CONFIRM_DIALOG_TIMEOUT,
+    CONFIRM_POLL_INTERVAL,
     DEADSPACE,
     DUPE_COORD_TOL,
-    IMAGE_REC_TOLERANCE,
     SCROLL_PAUSE_TIME,
     SEARCH_BAR_COORD,
     UNFOLLOW_CLICK_TIMEOUT,
 )
-from image_rec import find_image
+from detection import button_locations, detect_unfollow_buttons, locate_confirm_button, unfollow_region
+from frame import Frame
+from image_rec import Region
+from metrics import metrics, span
+from scroll_tracker import PageTracker
 from window import focus_chrome_window, scroll_page
 
 logger = setup_logger()
 csv_logger = OperationLogger()
 
 
+@span("navigation")
 def get_to_unfollow_page() -> None:
+    if cdp.navigate(BASE_UNFOLLOW_URL):
+        return
     pyautogui.click(SEARCH_BAR_COORD)
     pyautogui.press("delete")
     pyautogui.write(BASE_UNFOLLOW_URL)
     pyautogui.press("enter")
 
 
-def remove_duplicate_coords(coords: list[tuple[int, int]], tolerance: float = DUPE_COORD_TOL) -> list[tuple[int, int]]:
-    """
-    Remove duplicate coordinates that are within tolerance distance of each other.
-
-    Args:
-        coords: List of (x, y) tuples
-        tolerance: Euclidean distance threshold for considering coords as duplicates
-
-    Returns:
-        List of unique coordinates
-    """
-    if not coords:
-        return []
-
-    unique_coords = []
-
-    for coord in coords:
-        is_duplicate = False
-        for existing in unique_coords:
-            distance = (
-                (coord[0] - existing[0]) ** 2 + (coord[1] - existing[1]) ** 2
-            ) ** 0.5
-            if distance < tolerance:
-                is_duplicate = True
-                break
-
-        if not is_duplicate:
-            unique_coords.append(coord)
-
-    return unique_coords
-
-
-def find_all_unfollow_buttons() -> list[tuple[int, int]]:
-    base_image = pyautogui.screenshot()
-    reference_image_folder = r"assets/unfollow_button_images"
+def find_all_unfollow_buttons(frame: Frame | None = None, region: Region | None = None) -> list[tuple[int, int]]:
+    coords = cdp.locate("unfollow", region)
+    if coords:
+        return coords
 
-    all_button_coords = []
+    if frame is None:
+        frame = capture_frame()
 
-    if os.path.exists(reference_image_folder):
-        for image_file in os.listdir(reference_image_folder):
-            if image_file.endswith((".png", ".jpg", ".jpeg")):
-                reference_path = os.path.join(reference_image_folder, image_file)
-                coords = find_image(base_image, reference_path, IMAGE_REC_TOLERANCE)
-                all_button_coords.extend(coords)
+    return detect_unfollow_buttons(frame, region=region).coords
 
-    all_button_coords = remove_duplicate_coords(
-        all_button_coords, tolerance=DUPE_COORD_TOL
-    )
 
-    return all_button_coords
+def find_confirm_unfollow_button(frame: Frame | None = None) -> tuple[int, int] | None:
+    coords = cdp.locate("confirm")
+    if coords:
+        return coords[0]
 
+    if frame is not None:
+        match = locate_confirm_button(frame)
+        return match.coord if match is not None else None
 
-def find_confirm_unfollow_button() -> tuple[int, int] | None:
-    base_image = pyautogui.screenshot()
-    reference_image_folder = r"assets/confirm_unfollow_button_images"
-
-    all_button_coords = []
-
-    if os.path.exists(reference_image_folder):
-        for image_file in os.listdir(reference_image_folder):
-            if image_file.endswith((".png", ".jpg", ".jpeg")):
-                reference_path = os.path.join(reference_image_folder, image_file)
-                coords = find_image(base_image, reference_path, IMAGE_REC_TOLERANCE)
-                all_button_coords.extend(coords)
-
-    if all_button_coords:
-        logger.info(f"Found {len(all_button_coords)} confirm button candidates")
-        return all_button_coords[0]
-
-    return None
+    # The dialog may not have rendered yet right after the unfollow click:
+    # until the timeout, recapture and retry, with only the cheap check at its
+    # cached position once there is one, then search the whole screen
+    deadline = time.monotonic() + CONFIRM_DIALOG_TIMEOUT
+    while True:
+        frame = capture_frame()
+        waiting = time.monotonic() < deadline
+        search = not waiting or button_locations.get("confirm") is None
+        match = locate_confirm_button(frame, search=search)
+        if match is not None:
+            return match.coord
+        if not waiting:
+            return None
+        with span("wait"):
+            time.sleep(CONFIRM_POLL_INTERVAL)
+
+
+def click_all_unfollow_buttons(
+    button_coords: list[tuple[int, int]],
+    session_total: int,
+    page: PageTracker | None = None,
+    session: Session | None = None,
+    on_batch_done: Callable[[], None] | None = None,
+) -> int:
+    """
+    Click each unfollow button and confirm it.
 
+    Args:
+        button_coords: Unfollow buttons to click, in order
+        session_total: Users unfollowed before this batch (for the logs)
+        page: Page tracker to mark clicked buttons as handled in
+        session: Checkpoint session to record attempts in
+        on_batch_done: Called once right after the last confirm click and its
+            mark on page, before the logging, checkpoint and final settle
+            wait, so the next scroll and scan run alongside them (called at
+            the end if the last one failed)
 
-def click_all_unfollow_buttons(button_coords: list[tuple[int, int]], session_total: int) -> int:
+    Returns:
+        Number of users unfollowed
+    """
     count = 0
-    confirm_button_coord = None
 
     for i, coord in enumerate(button_coords, 1):
-        pyautogui.click(coord)
-        time.sleep(UNFOLLOW_CLICK_TIMEOUT)
+        with span("click"):
+            pyautogui.click(coord)
+        with span("wait"):
+            time.sleep(UNFOLLOW_CLICK_TIMEOUT)
 
-        if confirm_button_coord is None:
-            logger.info("Searching for confirm unfollow button...")
-            confirm_button_coord = find_confirm_unfollow_button()
+        # Checks the cached dialog position first, so this is a template-sized
+        # match on every click but the first, and never clicks a stale spot
+        confirm_button_coord = find_confirm_unfollow_button()
 
-            if confirm_button_coord is None:
-                logger.warning("[UNFOLLOW] Confirm button not found! Clicking deadspace and waiting 60 seconds...")
+        if confirm_button_coord is None:
+            logger.warning("[UNFOLLOW] Confirm button not found! Clicking deadspace and waiting 60 seconds...")
+            with span("click"):
                 pyautogui.click(*DEADSPACE)
-                csv_logger.log_operation(
-                    operation='unfollow',
-                    success=False,
-                    target_profile='',
-                    details=f"Confirm button not found for unfollow at {coord}",
-                    session_total=session_total + count
-                )
+            csv_logger.log_operation(
+                operation='unfollow',
+                success=False,
+                target_profile='',
+                details=f"Confirm button not found for unfollow at {coord}",
+                session_total=session_total + count
+            )
+            if session is not None:
+                session.record_attempt("unfollow", str(coord), False, "Confirm button not found")
+            with span("wait"):
                 time.sleep(60)
-                continue
-            else:
-                logger.info(f"[UNFOLLOW] Confirm button found at {confirm_button_coord}, will reuse for batch")
+            continue
 
-        pyautogui.click(confirm_button_coord)
-        pyautogui.moveTo(*DEADSPACE, duration=0.1)
-        time.sleep(UNFOLLOW_CLICK_TIMEOUT)
+        with span("click"):
+            pyautogui.click(confirm_button_coord)
         count += 1
+        # Marked before on_batch_done, which hands the page tracker to the scanner
+        if page is not None:
+            page.mark_handled(coord)
+        if i == len(button_coords) and on_batch_done is not None:
+            on_batch_done()
+            on_batch_done = None
+        with span("click"):
+            pyautogui.moveTo(*DEADSPACE, duration=0.1)
         logger.info(f"[UNFOLLOW] Clicked unfollow button {i}/{len(button_coords)} at position {coord}")
         csv_logger.log_operation(
             operation='unfollow',
@@ -140,53 +150,172 @@ def click_all_unfollow_buttons(button_coords: list[tuple[int, int]], session_tot
             details=f"Unfollowed user at coordinates {coord}, confirm at {confirm_button_coord}",
             session_total=session_total + count
         )
+        if session is not None:
+            session.record_attempt("unfollow", str(coord), True, f"confirm at {confirm_button_coord}")
+            session.save_progress(session_total + count)
+
+        with span("wait"):
+            time.sleep(UNFOLLOW_CLICK_TIMEOUT)
+
+    if on_batch_done is not None:
+        on_batch_done()
     return count
 
 
-def main() -> None:
-    logger.info("=== UNFOLLOW OPERATION STARTED ===")
+class Detection(NamedTuple):
+    """Unfollow buttons found in one captured frame."""
+
+    timestamp: float
+    coords: list[tuple[int, int]]
+    scrolled: int | None
+    revealed: Region | None
+
+
+class ButtonScanner:
+    """
+    Captures and scans the viewport on a worker thread.
+
+    Right after the last confirm click of a batch the main thread scrolls
+    and calls scrolled(); the scanner waits for the page to settle, captures
+    and matches while the main thread logs, checkpoints and does its own
+    post-click wait, so detection time overlaps the click sequence instead
+    of following it. Each result carries its frame's capture time, and
+    next() drops any result captured before the most recent scroll and
+    scans again.
+
+    The page tracker is only touched by the worker between a request and the
+    matching next(), and by the main thread otherwise.
+    """
+
+    def __init__(self, page: PageTracker):
+        self.page = page
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._results: queue.SimpleQueue = queue.SimpleQueue()
+        self._last_scroll = 0.0
+        self._thread = threading.Thread(target=self._run, name="unfollow-scanner", daemon=True)
+        self._thread.start()
+
+    def request(self) -> None:
+        """Scan the viewport as it is now (no scroll since the last scan)."""
+        self._requests.put(True)
+
+    def scrolled(self) -> None:
+        """Note that the page was just scrolled and scan the new viewport."""
+        self._last_scroll = time.time()
+        self._requests.put(True)
+
+    def _run(self) -> None:
+        while self._requests.get():
+            try:
+                wait_for_stable(tracker=unfollow_region, timeout=1)
+                frame = capture_frame()
+                scrolled = self.page.observe(frame)
+                revealed = self.page.revealed_region(frame, scrolled)
+                coords = find_all_unfollow_buttons(frame, revealed)
+                self._results.put(Detection(frame.timestamp, coords, scrolled, revealed))
+            except Exception as e:
+                self._results.put(e)
+
+    def next(self) -> Detection:
+        """Block until the scan of the current viewport is ready."""
+        while True:
+            with span("detect_wait"):
+                result = self._results.get()
+            if isinstance(result, Exception):
+                raise result
+            if result.timestamp >= self._last_scroll:
+                return result
+            logger.debug("Discarding unfollow buttons detected before the last scroll")
+            self._requests.put(True)
+
+    def close(self) -> None:
+        self._requests.put(False)
+
+
+def main(resume: bool = False) -> None:
+    """
+    Unfollow everyone on the following page.
+
+    Args:
+        resume: Continue the last unfinished unfollow session (its running
+            total and attempt history) instead of starting a new one
+    """
+    metrics.reset()
+    store = CheckpointStore()
+    session = store.resume_or_start("unfollow", resume)
+    try:
+        run_unfollow(session)
+    except BaseException:
+        session.finish("interrupted")
+        raise
+    else:
+        session.finish()
+    finally:
+        store.close()
+        metrics.export("unfollow")
+
+
+def run_unfollow(session: Session) -> None:
+    if session.progress:
+        logger.info(f"=== UNFOLLOW OPERATION RESUMED === Session {session.id}, {session.progress} users unfollowed so far")
+    else:
+        logger.info("=== UNFOLLOW OPERATION STARTED ===")
     time.sleep(3)
 
     focus_chrome_window()
     time.sleep(1)
     get_to_unfollow_page()
-    time.sleep(3)
+    wait_for_stable(tracker=unfollow_region, timeout=3, min_wait=1)
 
-    total_unfollowed = 0
+    total_unfollowed = session.progress
     zero_found_counter = 0
+    page = PageTracker(radius=DUPE_COORD_TOL)
+    scanner = ButtonScanner(page)
 
-    while True:
-        pyautogui.moveTo(*DEADSPACE, duration=0.1)
-        logger.info("Searching for unfollow buttons...")
-        time.sleep(1)
-        button_coords = find_all_unfollow_buttons()
-
-        current_count = len(button_coords)
-
-        if current_count == 0:
-            zero_found_counter += 1
-            logger.warning(f"[UNFOLLOW] No unfollow buttons found. ({zero_found_counter}/3)")
-            if zero_found_counter >= 3:
-                logger.info("[UNFOLLOW] No buttons found after 3 attempts. Done.")
-                break
-        else:
-            zero_found_counter = 0
-            logger.info(f"[UNFOLLOW] Found {current_count} unfollow buttons on screen.")
-
-        logger.info(f"[UNFOLLOW] Clicking {current_count} unfollow buttons...")
-        unfollowed_this_batch = click_all_unfollow_buttons(button_coords, total_unfollowed)
-        total_unfollowed += unfollowed_this_batch
-        logger.info(f"[UNFOLLOW] Progress: {total_unfollowed} users unfollowed so far")
-
+    def scroll_and_scan() -> None:
         logger.info("Scrolling down to load more...")
-        scroll_page()
-        time.sleep(1)
-        pyautogui.moveTo(*DEADSPACE, duration=0.1)
+        with span("scroll"):
+            scroll_page(wait=False)
+        scanner.scrolled()
+
+    pyautogui.moveTo(*DEADSPACE, duration=0.1)
+    scanner.request()
+    try:
+        while True:
+            logger.info("Searching for unfollow buttons...")
+            detection = scanner.next()
+            if detection.revealed is not None:
+                logger.info(
+                    f"[UNFOLLOW] Page scrolled {detection.scrolled}px, "
+                    f"scanning the newly revealed {detection.revealed.height}px"
+                )
+            button_coords = [coord for coord in detection.coords if not page.is_handled(coord)]
+
+            current_count = len(button_coords)
+
+            if current_count == 0:
+                zero_found_counter += 1
+                logger.warning(f"[UNFOLLOW] No unfollow buttons found. ({zero_found_counter}/3)")
+                if zero_found_counter >= 3:
+                    logger.info("[UNFOLLOW] No buttons found after 3 attempts. Done.")
+                    break
+            else:
+                zero_found_counter = 0
+                logger.info(f"[UNFOLLOW] Found {current_count} unfollow buttons on screen.")
+
+            logger.info(f"[UNFOLLOW] Clicking {current_count} unfollow buttons...")
+            unfollowed_this_batch = click_all_unfollow_buttons(
+                button_coords, total_unfollowed, page, session, on_batch_done=scroll_and_scan
+            )
+            total_unfollowed += unfollowed_this_batch
+            logger.info(f"[UNFOLLOW] Progress: {total_unfollowed} users unfollowed so far")
+    finally:
+        scanner.close()
 
     logger.info(f"=== UNFOLLOW OPERATION COMPLETED === Total unfollowed: {total_unfollowed} users")
 
 
 if __name__ == "__main__":
     launch_chrome(url="https://example.com", incognito=False)
-    time.sleep(3)
+    wait_for_chrome()
     main()
@@ -14,19 +14,42 @@ def print_active_titles() -> None:
             print(window.title)
 
 
+CHROME_TITLE = "Google Chrome"
+
+_chrome_window: Any | None = None
+
+
+def _is_chrome_window(window: Any) -> bool:
+    # title is read from the live handle, so a closed window comes back empty
+    try:
+        return CHROME_TITLE in window.title
+    except Exception:
+        return False
+
+
 def get_chrome_window() -> Any | None:
-    substring = "Google Chrome"
+    """
+    Return the Chrome window, enumerating all windows only when the cached
+    handle is gone (window closed, or its title no longer mentions Chrome).
+    """
+    global _chrome_window
+    if _chrome_window is not None and _is_chrome_window(_chrome_window):
+        return _chrome_window
+
+    _chrome_window = None
     windows = pygetwindow.getAllWindows()
     for window in windows:
-        if substring in window.title:
+        if _is_chrome_window(window):
+            _chrome_window = window
             return window
     return None
 
 
-def scroll_page() -> None:
+def scroll_page(wait: bool = True) -> None:
     pyautogui.moveTo(*DEADSPACE, duration=0.1)
     pyautogui.scroll(-1 * SCROLL_AMOUNT)
-    time.sleep(SCROLL_PAUSE_TIME)
+    if wait:
+        time.sleep(SCROLL_PAUSE_TIME)
 
 
 def focus_chrome_window() -> bool: